@@ -9,17 +9,32 @@ Usage:
     python cli.py make-accessible <pdf_path> [--output <output_path>]
     python cli.py extract-figures <pdf_path> [--save-to <dir>]
     python cli.py validate <pdf_path>
+    python cli.py batch "<glob>" [--action <command>]
 """
 
 import click
+import glob
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.text import Text
 
 console = Console()
 
+# Alt-text generation is network-bound, so figures are described concurrently
+MAX_ALT_TEXT_WORKERS = 16
+
+
+def print_figure_result(label: str, alt_text: str, preview_chars: int = 60):
+    """Print a per-figure progress line without parsing the alt-text as Rich markup."""
+    console.print(
+        Text.assemble("  ", ("✓", "green"), f" {label}: {alt_text[:preview_chars]}..."),
+        highlight=False,
+    )
+
 
 @click.group()
 def cli():
@@ -32,7 +47,7 @@ def cli():
 def analyze(pdf_path: str):
     """Analyze a PDF for accessibility status."""
     from src.pdf_tagger import get_pdf_info
-    from src.figure_extractor import extract_figures, get_figures_summary
+    from src.figure_extractor import extract_figures
     from src.tag_injector import get_existing_alt_texts
     from src.validator import quick_accessibility_check
 
@@ -43,19 +58,28 @@ def analyze(pdf_path: str):
         TextColumn("[progress.description]{task.description}"),
         console=console,
     ) as progress:
-        task = progress.add_task("Getting PDF info...", total=None)
-
-        info = get_pdf_info(pdf_path)
-        progress.update(task, description="Extracting figures...")
-
-        figures = extract_figures(pdf_path)
-        summary = get_figures_summary(figures)
-        progress.update(task, description="Checking existing alt-texts...")
-
-        existing_alts = get_existing_alt_texts(pdf_path)
-        progress.update(task, description="Running validation...")
-
-        validation = quick_accessibility_check(pdf_path)
+        task = progress.add_task("Analyzing PDF...", total=None)
+
+        # Each step opens the file independently, and only extract_figures
+        # uses PyMuPDF (the rest use pikepdf), so they can run side by side
+        steps = {
+            "info": get_pdf_info,
+            "figures": extract_figures,
+            "existing_alts": get_existing_alt_texts,
+            "validation": quick_accessibility_check,
+        }
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            futures = {executor.submit(func, pdf_path): key for key, func in steps.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                results[key] = future.result()
+                progress.update(task, description=f"Analyzing PDF ({len(results)}/{len(steps)} checks done)...")
+
+    info = results["info"]
+    figure_count = len(results["figures"])
+    alt_text_count = sum(1 for a in results["existing_alts"] if a.get("alt_text"))
+    validation = results["validation"]
 
     # Display results
     table = Table(title="PDF Information")
@@ -67,8 +91,8 @@ def analyze(pdf_path: str):
     table.add_row("Has Structure Tree", "Yes ✓" if info["has_struct_tree"] else "No ✗")
     table.add_row("Language Set", info.get("lang", "No ✗") if info["has_lang"] else "No ✗")
     table.add_row("Title", info.get("title", "No ✗")[:50] if info["has_title"] else "No ✗")
-    table.add_row("Figures Found", str(summary["count"]))
-    table.add_row("Figures with Alt-text", str(len([a for a in existing_alts if a.get("alt_text")])))
+    table.add_row("Figures Found", str(figure_count))
+    table.add_row("Figures with Alt-text", str(alt_text_count))
 
     console.print(table)
 
@@ -83,7 +107,7 @@ def analyze(pdf_path: str):
     console.print("\n[bold]Recommendations:[/bold]")
     if not info["is_tagged"]:
         console.print("  → Add structure tags: [cyan]python cli.py add-tags <pdf>[/cyan]")
-    if summary["count"] > len([a for a in existing_alts if a.get("alt_text")]):
+    if figure_count > alt_text_count:
         console.print("  → Generate alt-text: [cyan]python cli.py make-accessible <pdf>[/cyan]")
     if validation["likely_valid"]:
         console.print("  [green]PDF appears to meet basic accessibility requirements![/green]")
@@ -95,8 +119,8 @@ def analyze(pdf_path: str):
 @click.option("--doc-type", default="academic paper", help="Document type for AI context")
 def make_accessible(pdf_path: str, output: str, doc_type: str):
     """Make a PDF accessible by adding structure tags and alt-text."""
-    from src.pdf_tagger import is_tagged_pdf, create_basic_structure
-    from src.figure_extractor import extract_figures, extract_figure_context
+    from src.pdf_tagger import is_tagged_pdf, create_basic_structure, copy_pdf
+    from src.figure_extractor import extract_figures_with_contexts, VISION_MAX_DIM
     from src.ai_describer import generate_alt_text
     from src.tag_injector import inject_alt_text
     from src.validator import quick_accessibility_check
@@ -120,17 +144,23 @@ def make_accessible(pdf_path: str, output: str, doc_type: str):
 
         # Step 2: Extract figures
         progress.update(task, description="Extracting figures...")
-        figures = extract_figures(working_path)
+        figures, contexts = extract_figures_with_contexts(working_path, max_dim=VISION_MAX_DIM)
         console.print(f"  [green]✓[/green] Found {len(figures)} figures")
 
         # Step 3: Generate alt-text
         figures_with_alt = []
-        for i, fig in enumerate(figures):
-            progress.update(task, description=f"Generating alt-text for figure {i+1}/{len(figures)}...")
-            context = extract_figure_context(working_path, fig)
-            alt_text = generate_alt_text(fig.image_data, context, doc_type)
-            figures_with_alt.append((fig, alt_text))
-            console.print(f"  [green]✓[/green] Figure {i+1}: {alt_text[:60]}...")
+        if figures:
+            with ThreadPoolExecutor(max_workers=min(MAX_ALT_TEXT_WORKERS, len(figures))) as executor:
+                alt_texts = executor.map(
+                    generate_alt_text,
+                    [fig.image_data for fig in figures],
+                    contexts,
+                    [doc_type] * len(figures),
+                )
+                for i, (fig, alt_text) in enumerate(zip(figures, alt_texts)):
+                    progress.update(task, description=f"Generating alt-text for figure {i+1}/{len(figures)}...")
+                    figures_with_alt.append((fig, alt_text))
+                    print_figure_result(f"Figure {i+1}", alt_text)
 
         # Step 4: Inject alt-text
         if figures_with_alt:
@@ -139,8 +169,7 @@ def make_accessible(pdf_path: str, output: str, doc_type: str):
         else:
             output_path = working_path if not output else output
             if output and output != working_path:
-                import shutil
-                shutil.copy(working_path, output)
+                copy_pdf(working_path, output)
 
         # Step 5: Validate
         progress.update(task, description="Validating result...")
@@ -155,12 +184,11 @@ def make_accessible(pdf_path: str, output: str, doc_type: str):
 @click.option("--save-to", "-s", help="Directory to save extracted images")
 def extract_figures(pdf_path: str, save_to: str):
     """Extract figures from a PDF."""
-    from src.figure_extractor import extract_figures as do_extract, get_figures_summary, save_figures
+    from src.figure_extractor import extract_figures as do_extract, save_figures
 
     console.print(f"\n[bold]Extracting figures from:[/bold] {pdf_path}\n")
 
     figures = do_extract(pdf_path)
-    summary = get_figures_summary(figures)
 
     if not figures:
         console.print("[yellow]No figures found in PDF[/yellow]")
@@ -172,12 +200,12 @@ def extract_figures(pdf_path: str, save_to: str):
     table.add_column("Size")
     table.add_column("BBox")
 
-    for fig_info in summary["figures"]:
-        bbox = fig_info["bbox"]
+    for fig in figures:
+        bbox = fig.bbox
         table.add_row(
-            str(fig_info["page"]),
-            str(fig_info["index"]),
-            fig_info["size"],
+            str(fig.page_num + 1),
+            str(fig.index),
+            f"{fig.width}x{fig.height}",
             f"({bbox[0]:.0f}, {bbox[1]:.0f}, {bbox[2]:.0f}, {bbox[3]:.0f})",
         )
 
@@ -231,6 +259,36 @@ def add_tags(pdf_path: str, output: str):
     console.print(f"  Title: {info.get('title', 'N/A')[:50]}")
 
 
+@cli.command()
+@click.argument("pattern")
+@click.option(
+    "--action", "-a",
+    type=click.Choice(["analyze", "validate", "add-tags", "make-accessible"]),
+    default="analyze",
+    help="Command to run on each matching PDF",
+)
+@click.pass_context
+def batch(ctx: click.Context, pattern: str, action: str):
+    """Run a command on every PDF matching a glob pattern in one process."""
+    pdf_paths = sorted(glob.glob(pattern, recursive=True))
+    if not pdf_paths:
+        console.print(f"[yellow]No files match:[/yellow] {pattern}")
+        return
+
+    command = cli.get_command(ctx, action)
+    failed = []
+    for pdf_path in pdf_paths:
+        try:
+            ctx.invoke(command, pdf_path=pdf_path)
+        except Exception as e:
+            console.print(f"[red]✗ {pdf_path}: {e}[/red]")
+            failed.append(pdf_path)
+
+    console.print(f"\n[bold]Batch complete:[/bold] {len(pdf_paths) - len(failed)}/{len(pdf_paths)} succeeded")
+    if failed:
+        ctx.exit(1)
+
+
 # ============================================
 # LaTeX Commands
 # ============================================
@@ -239,11 +297,11 @@ def add_tags(pdf_path: str, output: str):
 @click.argument("latex_path", type=click.Path(exists=True))
 def analyze_latex(latex_path: str):
     """Analyze a LaTeX file for accessibility features."""
-    from src.latex_processor import analyze_latex as do_analyze
+    from src.latex_processor import analyze_latex as do_analyze, read_latex_file
 
     console.print(f"\n[bold]Analyzing LaTeX:[/bold] {latex_path}\n")
 
-    content = Path(latex_path).read_text()
+    content = read_latex_file(latex_path)
     analysis = do_analyze(content)
 
     table = Table(title="LaTeX Accessibility Analysis")
@@ -282,12 +340,13 @@ def analyze_latex(latex_path: str):
 def prepare_latex(latex_path: str, output: str, title: str, author: str, lang: str):
     """Add accessibility preamble to a LaTeX file."""
     from src.latex_processor import (
-        add_accessibility_preamble, extract_title_from_latex, extract_author_from_latex
+        add_accessibility_preamble, extract_title_from_latex, extract_author_from_latex,
+        read_latex_source, write_latex_file
     )
 
     console.print(f"\n[bold]Preparing LaTeX:[/bold] {latex_path}\n")
 
-    content = Path(latex_path).read_text()
+    content, encoding = read_latex_source(latex_path)
 
     # Auto-detect if not provided
     title = title or extract_title_from_latex(content) or Path(latex_path).stem
@@ -299,7 +358,7 @@ def prepare_latex(latex_path: str, output: str, title: str, author: str, lang: s
         p = Path(latex_path)
         output = str(p.parent / f"{p.stem}_accessible{p.suffix}")
 
-    Path(output).write_text(modified)
+    write_latex_file(output, modified, encoding)
 
     console.print(f"[green]✓[/green] Created: {output}")
     console.print(f"  Title: {title}")
@@ -320,16 +379,17 @@ def make_latex_accessible(latex_path: str, pdf_path: str, output: str):
     """Full pipeline: prepare LaTeX, extract figures from PDF, generate alt-text."""
     from src.latex_processor import (
         add_accessibility_preamble, find_figures as find_latex_figures,
-        add_all_figure_alt_texts, extract_title_from_latex, extract_author_from_latex
+        add_all_figure_alt_texts, extract_title_from_latex, extract_author_from_latex,
+        read_latex_source, write_latex_file
     )
-    from src.figure_extractor import extract_figures, extract_figure_context
+    from src.figure_extractor import extract_figures_with_contexts, VISION_MAX_DIM
     from src.ai_describer import generate_alt_text
 
     console.print(f"\n[bold]Making LaTeX accessible:[/bold]")
     console.print(f"  LaTeX: {latex_path}")
     console.print(f"  PDF:   {pdf_path}\n")
 
-    latex_content = Path(latex_path).read_text()
+    latex_content, encoding = read_latex_source(latex_path)
 
     with Progress(
         SpinnerColumn(),
@@ -353,19 +413,24 @@ def make_latex_accessible(latex_path: str, pdf_path: str, output: str):
 
         # Step 3: Extract figures from PDF
         progress.update(task, description="Extracting figures from PDF...")
-        pdf_figures = extract_figures(pdf_path)
+        pdf_figures, contexts = extract_figures_with_contexts(pdf_path, max_dim=VISION_MAX_DIM)
         console.print(f"  [green]✓[/green] Extracted {len(pdf_figures)} figures from PDF")
 
         # Step 4: Generate alt-text for each figure
         alt_texts = []
-        for i, pdf_fig in enumerate(pdf_figures):
-            progress.update(task, description=f"Generating alt-text {i+1}/{len(pdf_figures)}...")
-            context = extract_figure_context(pdf_path, pdf_fig)
-            if i < len(latex_figures) and latex_figures[i].caption:
-                context += f"\nCaption: {latex_figures[i].caption}"
-            alt_text = generate_alt_text(pdf_fig.image_data, context)
-            alt_texts.append(alt_text)
-            console.print(f"  [green]✓[/green] Figure {i+1}: {alt_text[:50]}...")
+        if pdf_figures:
+            for i, latex_fig in enumerate(latex_figures[:len(contexts)]):
+                if latex_fig.caption:
+                    contexts[i] += f"\nCaption: {latex_fig.caption}"
+
+            with ThreadPoolExecutor(max_workers=min(MAX_ALT_TEXT_WORKERS, len(pdf_figures))) as executor:
+                results = executor.map(
+                    generate_alt_text, [fig.image_data for fig in pdf_figures], contexts
+                )
+                for i, alt_text in enumerate(results):
+                    progress.update(task, description=f"Generating alt-text {i+1}/{len(pdf_figures)}...")
+                    alt_texts.append(alt_text)
+                    print_figure_result(f"Figure {i+1}", alt_text, preview_chars=50)
 
         # Step 5: Add alt-texts to LaTeX
         if alt_texts and len(alt_texts) <= len(latex_figures):
@@ -377,7 +442,7 @@ def make_latex_accessible(latex_path: str, pdf_path: str, output: str):
         p = Path(latex_path)
         output = str(p.parent / f"{p.stem}_accessible{p.suffix}")
 
-    Path(output).write_text(latex_content)
+    write_latex_file(output, latex_content, encoding)
 
     console.print(f"\n[bold green]Success![/bold green] Output: {output}")
     console.print("\n[bold]Next steps:[/bold]")
@@ -390,11 +455,11 @@ def make_latex_accessible(latex_path: str, pdf_path: str, output: str):
 @click.argument("latex_path", type=click.Path(exists=True))
 def check_figures(latex_path: str):
     """Check which figure files exist locally and which are missing."""
-    from src.latex_processor import check_figure_files, get_missing_figures_prompt
+    from src.latex_processor import check_figure_files, get_missing_figures_prompt, read_latex_file
 
     console.print(f"\n[bold]Checking figures in:[/bold] {latex_path}\n")
 
-    latex_content = Path(latex_path).read_text()
+    latex_content = read_latex_file(latex_path)
     status = check_figure_files(latex_content, latex_path)
 
     # Summary
@@ -441,13 +506,14 @@ def process_figures(latex_path: str, output: str, figure_dir: str):
     """Process LaTeX by reading figure files directly (no PDF needed)."""
     from src.latex_processor import (
         check_figure_files, add_accessibility_preamble, find_figures as find_latex_figures,
-        add_figure_alt_text, extract_title_from_latex, extract_author_from_latex
+        add_figure_alt_text, extract_title_from_latex, extract_author_from_latex,
+        read_latex_source, write_latex_file
     )
-    from src.ai_describer import generate_alt_text
+    from src.ai_describer import generate_alt_text, load_image_for_description
 
     console.print(f"\n[bold]Processing figures from:[/bold] {latex_path}\n")
 
-    latex_content = Path(latex_path).read_text()
+    latex_content, encoding = read_latex_source(latex_path)
 
     with Progress(
         SpinnerColumn(),
@@ -472,27 +538,34 @@ def process_figures(latex_path: str, output: str, figure_dir: str):
         # Step 3: Generate alt-text for each found figure
         processed = []
         skipped = []
+        found = []
 
         for fig in status["all"]:
             if fig.resolved_path and fig.resolved_path.exists():
-                progress.update(task, description=f"Processing figure {fig.figure_index + 1}...")
-                image_data = fig.resolved_path.read_bytes()
-                context = f"Caption: {fig.caption}" if fig.caption else ""
-                alt_text = generate_alt_text(image_data, context)
-
-                # Add alt-text to this figure
-                latex_content = add_figure_alt_text(latex_content, fig.figure_index, alt_text)
-                processed.append((fig.figure_index, fig.image_ref, alt_text))
-                console.print(f"  [green]✓[/green] Figure {fig.figure_index + 1}: {alt_text[:50]}...")
+                found.append(fig)
             else:
                 skipped.append((fig.figure_index, fig.image_ref))
 
+        def describe(fig):
+            image_data = load_image_for_description(fig.resolved_path)
+            context = f"Caption: {fig.caption}" if fig.caption else ""
+            return generate_alt_text(image_data, context)
+
+        if found:
+            with ThreadPoolExecutor(max_workers=min(MAX_ALT_TEXT_WORKERS, len(found))) as executor:
+                # Results arrive in order, so edits to latex_content stay on this thread
+                for i, (fig, alt_text) in enumerate(zip(found, executor.map(describe, found))):
+                    progress.update(task, description=f"Processing figure {i + 1}/{len(found)}...")
+                    latex_content = add_figure_alt_text(latex_content, fig.figure_index, alt_text)
+                    processed.append((fig.figure_index, fig.image_ref, alt_text))
+                    print_figure_result(f"Figure {fig.figure_index + 1}", alt_text, preview_chars=50)
+
     # Write output
     if output is None:
         p = Path(latex_path)
         output = str(p.parent / f"{p.stem}_accessible{p.suffix}")
 
-    Path(output).write_text(latex_content)
+    write_latex_file(output, latex_content, encoding)
 
     console.print(f"\n[bold green]Success![/bold green] Output: {output}")
     console.print(f"  Processed: {len(processed)} figures")
@@ -162,7 +162,7 @@ aws ssm send-command \
         \"chown -R mcpuser:mcpuser /home/mcpuser/app\",
         \"cd /home/mcpuser/app && source venv/bin/activate 2>/dev/null || python3.11 -m venv venv && source venv/bin/activate\",
         \"pip install -r requirements.txt\",
-        \"pip install fastapi uvicorn python-multipart\",
+        \"pip install fastapi 'uvicorn[standard]' python-multipart orjson\",
         \"systemctl restart accessibility-mcp\"
     ]" \
     --output text \
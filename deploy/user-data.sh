@@ -66,8 +66,9 @@ sudo -u mcpuser /home/mcpuser/app/venv/bin/pip install --upgrade pip
 # Install base dependencies
 sudo -u mcpuser /home/mcpuser/app/venv/bin/pip install \
     fastapi \
-    uvicorn \
+    'uvicorn[standard]' \
     python-multipart \
+    orjson \
     mcp \
     pikepdf \
     PyMuPDF \
@@ -99,7 +100,7 @@ User=mcpuser
 WorkingDirectory=/home/mcpuser/app
 Environment=PATH=/home/mcpuser/app/venv/bin:/usr/local/bin:/usr/bin
 EnvironmentFile=/home/mcpuser/app/.env
-ExecStart=/home/mcpuser/app/venv/bin/python -m uvicorn http_server:app --host 0.0.0.0 --port 8080
+ExecStart=/home/mcpuser/app/venv/bin/python -m uvicorn http_server:app --host 0.0.0.0 --port 8080 --loop auto --http auto
 Restart=always
 RestartSec=10
 
@@ -8,27 +8,41 @@ Endpoints:
 - GET /health - Health check
 - GET /tools - List all available tools
 - POST /tools/{tool_name} - Execute a specific tool
-- POST /batch - Execute multiple tools in sequence
+- POST /batch - Execute multiple tools (concurrently by default)
 """
 
 import asyncio
 import json
 import os
+import re
+import secrets
 import tempfile
 import shutil
+import stat
+import sys
 import base64
+import hashlib
+import time
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel
+from mcp.types import TextContent
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; falls back to the stdlib codec
+    orjson = None
 
 # Import the MCP server components
-from src.mcp_server import call_tool, list_tools, run_verapdf
-from src.validator import calculate_morphmind_score
+from src.mcp_server import call_tool, list_tools, run_verapdf, run_in_tool_pool
+from src.validator import score_verapdf_result
 
 
 # ============================================
@@ -41,6 +55,7 @@ class ToolRequest(BaseModel):
 
 class BatchRequest(BaseModel):
     tools: list[dict[str, Any]]  # [{"name": "tool_name", "arguments": {...}}, ...]
+    sequential: bool = False  # Run tools one after another (for dependent steps)
 
 
 class ToolResponse(BaseModel):
@@ -62,17 +77,149 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR = Path(tempfile.gettempdir()) / "accessibility-mcp-outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# File IDs known to exist in each directory, so resolving them needs no stat
+uploaded_ids: set[str] = set()
+output_ids: set[str] = set()
+
 
 def cleanup_old_files():
-    """Clean up files older than 1 hour."""
-    import time
+    """Clean up files older than 1 hour and resync the known file IDs."""
     current_time = time.time()
-    for dir_path in [UPLOAD_DIR, OUTPUT_DIR]:
-        for file_path in dir_path.iterdir():
-            if file_path.is_file():
-                file_age = current_time - file_path.stat().st_mtime
-                if file_age > 3600:  # 1 hour
-                    file_path.unlink(missing_ok=True)
+    for dir_path, known_ids in [(UPLOAD_DIR, uploaded_ids), (OUTPUT_DIR, output_ids)]:
+        # scandir entries carry file type (and usually stat) from the directory read
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if current_time - entry.stat().st_mtime > 3600:  # 1 hour
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+                    known_ids.discard(entry.name)
+                else:
+                    known_ids.add(entry.name)
+
+
+# How often the background task sweeps the upload/output directories (seconds)
+CLEANUP_INTERVAL = 600
+
+
+async def periodic_cleanup():
+    """Run cleanup_old_files off the event loop, at startup and then periodically."""
+    while True:
+        try:
+            await asyncio.to_thread(cleanup_old_files)
+        except Exception as e:
+            print(f"File cleanup failed: {e}", file=sys.stderr)
+        await asyncio.sleep(CLEANUP_INTERVAL)
+
+
+# Characters allowed in stored filenames; anything else becomes "_"
+SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    """Reduce a client-supplied filename to a safe basename for use in file IDs."""
+    name = SAFE_NAME_RE.sub("_", Path(filename or "").name).lstrip(".")
+    return name or "upload"
+
+
+# Chunk size for copying uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
+
+def _keep_in_page_cache(f) -> None:
+    """Hint the kernel to keep a just-written upload cached for the tool that reads it next."""
+    if hasattr(os, "posix_fadvise"):
+        f.flush()
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+
+
+def _copy_upload(src, dest_path: Path) -> int:
+    """Copy an upload's spooled file to disk in chunks; returns bytes written."""
+    src.seek(0)
+    with open(dest_path, "wb") as f:
+        shutil.copyfileobj(src, f, UPLOAD_CHUNK_SIZE)
+        _keep_in_page_cache(f)
+        return f.tell()
+
+
+async def save_upload(upload: UploadFile, dest_path: Path) -> int:
+    """Stream an uploaded file to dest_path without buffering it in memory."""
+    return await asyncio.to_thread(_copy_upload, upload.file, dest_path)
+
+
+# ============================================
+# Validation Result Cache
+# ============================================
+
+class ValidationCache:
+    """
+    LRU cache of /agent/validate responses keyed by (content hash, profile).
+
+    veraPDF takes seconds per document, and agents often re-validate the
+    same PDF (retries, re-uploads under a new file_id).
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: tuple[str, str]) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple[str, str], value: dict):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+validation_cache = ValidationCache()
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's contents without loading it all into memory."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+# In-flight work keyed by request identity, shared by concurrent duplicates
+inflight: dict[tuple, asyncio.Task] = {}
+
+
+def _finish_flight(key: tuple, task: asyncio.Task) -> None:
+    """Drop a finished run from inflight and mark its outcome retrieved."""
+    if inflight.get(key) is task:
+        del inflight[key]
+    if not task.cancelled():
+        task.exception()  # There may be no callers left to retrieve it
+
+
+async def single_flight(key: tuple, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run coro_factory() once per key at a time.
+
+    The run is a task of its own; every caller, the first included, awaits
+    it shielded, so a cancelled caller never cancels the shared run or the
+    other callers waiting on its result (or exception).
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        inflight[key] = task
+        task.add_done_callback(lambda t: _finish_flight(key, t))
+    return await asyncio.shield(task)
 
 
 # ============================================
@@ -83,10 +230,26 @@ def cleanup_old_files():
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     # Startup
-    cleanup_old_files()
+    cleanup_task = asyncio.create_task(periodic_cleanup())
+
+    # Tool definitions are static for the process lifetime, so build them once
+    app.state.tools_by_name = {tool.name: tool for tool in await list_tools()}
+    app.state.tools_list = list(app.state.tools_by_name.values())
+    # ...and serialize the static listings once rather than on every hit
+    app.state.tools_json = _json_dumps({
+        "tools": [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.inputSchema,
+            }
+            for tool in app.state.tools_list
+        ]
+    }).encode()
+    app.state.openapi_tools_json = _json_dumps(build_openapi_tools(app.state.tools_list)).encode()
     yield
     # Shutdown
-    pass
+    cleanup_task.cancel()
 
 
 app = FastAPI(
@@ -119,37 +282,36 @@ async def health_check():
 @app.get("/tools")
 async def get_tools():
     """List all available tools with their schemas."""
-    tools = await list_tools()
-    return {
-        "tools": [
-            {
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": tool.inputSchema,
-            }
-            for tool in tools
-        ]
-    }
+    return Response(content=app.state.tools_json, media_type="application/json")
 
 
 @app.get("/tools/{tool_name}")
 async def get_tool_info(tool_name: str):
     """Get information about a specific tool."""
-    tools = await list_tools()
-    for tool in tools:
-        if tool.name == tool_name:
-            return {
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": tool.inputSchema,
-            }
-    raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
+    tool = app.state.tools_by_name.get(tool_name)
+    if tool is None:
+        raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "parameters": tool.inputSchema,
+    }
 
 
 # ============================================
 # Tool Execution Endpoints
 # ============================================
 
+# Tool argument names that carry file paths / file IDs
+PATH_KEYS = frozenset({"pdf_path", "latex_path", "image_path", "file_path", "output_path"})
+
+# Literal placeholder names agents sometimes send instead of a real file ID
+PLACEHOLDER_NAMES = frozenset({"file_id", "output_file", "pdf_path", "input_file"})
+
+# Cap on upload names echoed back in the placeholder error
+MAX_LISTED_UPLOADS = 20
+
+
 def resolve_file_path(value: str) -> str:
     """
     Resolve a file_id or path to an actual file path.
@@ -163,14 +325,24 @@ def resolve_file_path(value: str) -> str:
         value = value[1:]
 
     # Check for unresolved placeholder strings - return helpful error
-    placeholder_patterns = ["file_id", "output_file", "pdf_path", "input_file"]
-    if value.lower() in placeholder_patterns:
+    if value.lower() in PLACEHOLDER_NAMES:
+        # Only list a bounded sample; the upload dir can hold thousands of files
+        sample = []
+        if UPLOAD_DIR.exists():
+            with os.scandir(UPLOAD_DIR) as entries:
+                sample = [entry.name for entry in islice(entries, MAX_LISTED_UPLOADS)]
         raise ValueError(
             f"Received placeholder '{value}' instead of actual file path. "
             f"Please use the actual file_path returned from /upload or output_path from previous tool calls. "
-            f"Available files in uploads: {list(UPLOAD_DIR.iterdir()) if UPLOAD_DIR.exists() else []}"
+            f"Available files in uploads (up to {MAX_LISTED_UPLOADS}): {sample}"
         )
 
+    # File IDs we have already seen resolve without touching the filesystem
+    if value in uploaded_ids:
+        return str(UPLOAD_DIR / value)
+    if value in output_ids:
+        return str(OUTPUT_DIR / value)
+
     # If it's already an absolute path that exists, use it
     if value.startswith("/") and Path(value).exists():
         return value
@@ -178,11 +350,13 @@ def resolve_file_path(value: str) -> str:
     # Check if it's a file_id in our upload directory
     upload_path = UPLOAD_DIR / value
     if upload_path.exists():
+        uploaded_ids.add(value)
         return str(upload_path)
 
     # Check output directory too
     output_path = OUTPUT_DIR / value
     if output_path.exists():
+        output_ids.add(value)
         return str(output_path)
 
     # Return as-is if nothing found (let the tool handle the error)
@@ -190,17 +364,67 @@ def resolve_file_path(value: str) -> str:
 
 
 def resolve_arguments(arguments: dict) -> dict:
-    """Resolve file paths in tool arguments."""
-    resolved = {}
-    path_keys = ["pdf_path", "latex_path", "image_path", "file_path", "output_path"]
+    """Resolve file paths in tool arguments (returns the input dict if nothing changes)."""
+    resolved = None
 
     for key, value in arguments.items():
-        if key in path_keys and isinstance(value, str):
-            resolved[key] = resolve_file_path(value)
-        else:
-            resolved[key] = value
+        if key in PATH_KEYS and isinstance(value, str):
+            path = resolve_file_path(value)
+            if path != value:
+                if resolved is None:
+                    resolved = dict(arguments)
+                resolved[key] = path
+
+    return arguments if resolved is None else resolved
+
+
+def _json_loads(text: str) -> Any:
+    """Parse JSON tool output (orjson when available)."""
+    return orjson.loads(text) if orjson else json.loads(text)
 
-    return resolved
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize a JSON fragment (orjson when available)."""
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+
+def _looks_like_json(text: str) -> bool:
+    """Cheap hint that tool output may be serialized JSON (vs Markdown/plain text)."""
+    return text[:64].lstrip()[:1] in ("{", "[")
+
+
+def _is_json_text(text: str) -> bool:
+    """
+    Check whether tool output is valid serialized JSON, safe to embed as-is.
+
+    Markdown can start with "[" too (e.g. "[link](...)"), so the prefix check
+    alone is not enough.
+    """
+    if not _looks_like_json(text):
+        return False
+    try:
+        _json_loads(text)
+    except json.JSONDecodeError:  # orjson's error subclasses this
+        return False
+    return True
+
+
+def _parse_tool_text(text: str) -> Any:
+    """Parse tool output that looks like JSON; wrap anything else as raw_result."""
+    if _looks_like_json(text):
+        try:
+            return _json_loads(text)
+        except json.JSONDecodeError:  # orjson's error subclasses this
+            pass
+    return {"raw_result": text}
+
+
+def _tool_result_json(tool_name: str, text: str, name_key: str = "tool_name") -> str:
+    """
+    Wrap a tool's JSON output (checked with _is_json_text) in a success
+    envelope without re-serializing it.
+    """
+    return f'{{"success":true,"{name_key}":{_json_dumps(tool_name)},"result":{text},"error":null}}'
 
 
 @app.post("/tools/{tool_name}")
@@ -208,9 +432,7 @@ async def execute_tool(tool_name: str, request: ToolRequest):
     """Execute a specific tool with the given arguments."""
     try:
         # Verify tool exists
-        tools = await list_tools()
-        tool_names = [t.name for t in tools]
-        if tool_name not in tool_names:
+        if tool_name not in app.state.tools_by_name:
             raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
 
         # Resolve file paths in arguments (convert file_id to full path)
@@ -219,22 +441,18 @@ async def execute_tool(tool_name: str, request: ToolRequest):
         # Execute the tool
         result = await call_tool(tool_name, resolved_args)
 
-        # Parse result from TextContent
-        if result and hasattr(result[0], 'text'):
-            try:
-                parsed = json.loads(result[0].text)
-                return ToolResponse(
-                    success=True,
-                    tool_name=tool_name,
-                    result=parsed,
-                )
-            except json.JSONDecodeError:
-                # Return as plain text if not JSON
-                return ToolResponse(
-                    success=True,
-                    tool_name=tool_name,
-                    result=result[0].text,
+        # Pass JSON results straight through; wrap plain text
+        if result and isinstance(result[0], TextContent):
+            if _is_json_text(result[0].text):
+                return Response(
+                    content=_tool_result_json(tool_name, result[0].text),
+                    media_type="application/json",
                 )
+            return ToolResponse(
+                success=True,
+                tool_name=tool_name,
+                result=result[0].text,
+            )
 
         return ToolResponse(
             success=True,
@@ -251,47 +469,61 @@ async def execute_tool(tool_name: str, request: ToolRequest):
         )
 
 
+async def _run_batch_tool(tool_spec: dict[str, Any]):
+    """Resolve arguments and execute a single tool from a batch request."""
+    resolved_args = resolve_arguments(tool_spec.get("arguments", {}))
+    return await call_tool(tool_spec.get("name"), resolved_args)
+
+
 @app.post("/batch")
 async def execute_batch(request: BatchRequest):
-    """Execute multiple tools in sequence."""
+    """Execute multiple tools concurrently, or in order if `sequential` is set."""
+    if request.sequential:
+        raw_results = []
+        for tool_spec in request.tools:
+            try:
+                raw_results.append(await _run_batch_tool(tool_spec))
+            except Exception as e:
+                raw_results.append(e)
+    else:
+        raw_results = await asyncio.gather(
+            *(_run_batch_tool(tool_spec) for tool_spec in request.tools),
+            return_exceptions=True,
+        )
+
+    # Results are assembled as JSON text so tool output is never re-parsed
     results = []
-    for tool_spec in request.tools:
+    for tool_spec, result in zip(request.tools, raw_results):
         tool_name = tool_spec.get("name")
-        arguments = tool_spec.get("arguments", {})
-
-        # Resolve file paths
-        resolved_args = resolve_arguments(arguments)
 
-        try:
-            result = await call_tool(tool_name, resolved_args)
-            if result and hasattr(result[0], 'text'):
-                try:
-                    parsed = json.loads(result[0].text)
-                    results.append({
-                        "tool": tool_name,
-                        "success": True,
-                        "result": parsed,
-                    })
-                except json.JSONDecodeError:
-                    results.append({
-                        "tool": tool_name,
-                        "success": True,
-                        "result": result[0].text,
-                    })
+        if isinstance(result, Exception):
+            results.append(_json_dumps({
+                "tool": tool_name,
+                "success": False,
+                "error": str(result),
+            }))
+        elif result and isinstance(result[0], TextContent):
+            if _is_json_text(result[0].text):
+                results.append(_tool_result_json(tool_name, result[0].text, name_key="tool"))
             else:
-                results.append({
+                results.append(_json_dumps({
                     "tool": tool_name,
                     "success": True,
-                    "result": str(result),
-                })
-        except Exception as e:
-            results.append({
+                    "result": result[0].text,
+                    "error": None,
+                }))
+        else:
+            results.append(_json_dumps({
                 "tool": tool_name,
-                "success": False,
-                "error": str(e),
-            })
+                "success": True,
+                "result": str(result),
+                "error": None,
+            }))
 
-    return {"results": results}
+    return Response(
+        content='{"results":[' + ",".join(results) + "]}",
+        media_type="application/json",
+    )
 
 
 # ============================================
@@ -300,6 +532,45 @@ async def execute_batch(request: BatchRequest):
 # These endpoints return structured JSON specifically designed for
 # programmatic agent consumption (vs MCP text for human display)
 
+async def _validate_pdfua(pdf_path: str, profile: str, cache_key: tuple[str, str]) -> dict:
+    """Run veraPDF and build the /agent/validate response, caching successes."""
+    # Run veraPDF directly for structured result (on the bounded tool pool; it takes seconds)
+    result = await run_in_tool_pool(run_verapdf, pdf_path, profile)
+
+    if "error" in result:
+        return {
+            "success": False,
+            "error": result["error"]
+        }
+
+    # Calculate MorphMind score (memoized on the failure set)
+    morphmind = score_verapdf_result(result)
+
+    failures = result.get("failures", [])
+    response = {
+        "score": morphmind.score,
+        "grade": morphmind.grade,
+        "compliant": result["compliant"],
+        "profile": result.get("profile", profile),
+        "summary": result["summary"],
+        "issues_by_severity": morphmind.issues_by_severity,
+        "category_scores": morphmind.category_scores,
+        "failures": [
+            {
+                "clause": f.get("clause"),
+                "test_number": f.get("test_number"),
+                "description": f.get("description"),
+                "check_count": len(f.get("checks", [])),
+            }
+            for f in islice(failures, 20)  # Limit to 20
+        ],
+        "total_failures": len(failures),
+    }
+    validation_cache.put(cache_key, response)
+
+    return {"success": True, **response}
+
+
 @app.post("/agent/validate")
 async def agent_validate_pdfua(request: ToolRequest):
     """
@@ -320,54 +591,18 @@ async def agent_validate_pdfua(request: ToolRequest):
         # Resolve file path
         pdf_path = resolve_file_path(pdf_path)
 
-        # Run veraPDF directly for structured result
-        result = run_verapdf(pdf_path, profile)
-
-        if "error" in result:
-            return {
-                "success": False,
-                "error": result["error"]
-            }
+        # Identical content validated recently? Skip veraPDF entirely
+        cache_key = (await asyncio.to_thread(file_sha256, pdf_path), profile)
+        cached = validation_cache.get(cache_key)
+        if cached is not None:
+            return {"success": True, **cached}
 
-        # Calculate MorphMind score
-        failures_for_score = []
-        for failure in result.get("failures", []):
-            failures_for_score.append({
-                "clause": failure.get("clause", ""),
-                "test": failure.get("test_number"),
-                "message": failure.get("description", ""),
-                "count": len(failure.get("checks", [1])),
-            })
-
-        morphmind = calculate_morphmind_score(
-            passed_rules=result['summary']['passed_rules'],
-            failed_rules=result['summary']['failed_rules'],
-            passed_checks=result['summary']['passed_checks'],
-            failed_checks=result['summary']['failed_checks'],
-            failures=failures_for_score,
+        # Concurrent requests for the same content share one veraPDF run
+        return await single_flight(
+            ("validate", *cache_key),
+            lambda: _validate_pdfua(pdf_path, profile, cache_key),
         )
 
-        return {
-            "success": True,
-            "score": morphmind.score,
-            "grade": morphmind.grade,
-            "compliant": result["compliant"],
-            "profile": result.get("profile", profile),
-            "summary": result["summary"],
-            "issues_by_severity": morphmind.issues_by_severity,
-            "category_scores": morphmind.category_scores,
-            "failures": [
-                {
-                    "clause": f.get("clause"),
-                    "test_number": f.get("test_number"),
-                    "description": f.get("description"),
-                    "check_count": len(f.get("checks", [])),
-                }
-                for f in result.get("failures", [])[:20]  # Limit to 20
-            ],
-            "total_failures": len(result.get("failures", [])),
-        }
-
     except Exception as e:
         return {
             "success": False,
@@ -392,8 +627,8 @@ async def agent_make_accessible(request: ToolRequest):
         # Execute the tool
         result = await call_tool("make_accessible", resolved_args)
 
-        if result and hasattr(result[0], 'text'):
-            parsed = json.loads(result[0].text)
+        if result and isinstance(result[0], TextContent):
+            parsed = _json_loads(result[0].text)
 
             # Extract file_id from output_path for easy reuse
             output_path = parsed.get("output_path", "")
@@ -428,19 +663,18 @@ async def upload_file(file: UploadFile = File(...)):
     Upload a file (PDF, LaTeX, image) for processing.
     Returns a file_id that can be used in tool arguments.
     """
-    # Generate unique filename
-    file_id = f"{os.urandom(8).hex()}_{file.filename}"
+    # Every upload gets its own file_id: tools edit their inputs in place and
+    # derive output names from them, so clients must never share a file
+    file_id = f"{secrets.token_hex(8)}_{safe_filename(file.filename)}"
     file_path = UPLOAD_DIR / file_id
 
-    # Save uploaded file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    size = await save_upload(file, file_path)
+    uploaded_ids.add(file_id)
 
     return {
         "file_id": file_id,
         "file_path": str(file_path),
-        "size": file_path.stat().st_size,
+        "size": size,
         "message": f"Use '{file_path}' as the path in tool arguments",
     }
 
@@ -448,14 +682,20 @@ async def upload_file(file: UploadFile = File(...)):
 @app.get("/download/{file_id}")
 async def download_file(file_id: str):
     """Download a processed file by its ID."""
-    # Check both upload and output directories
-    for dir_path in [OUTPUT_DIR, UPLOAD_DIR]:
+    # Check both upload and output directories; one stat per candidate,
+    # reused by FileResponse instead of stat'ing again
+    for dir_path in (OUTPUT_DIR, UPLOAD_DIR):
         file_path = dir_path / file_id
-        if file_path.exists():
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        if stat.S_ISREG(st.st_mode):
             return FileResponse(
                 path=file_path,
                 filename=file_id,
                 media_type="application/octet-stream",
+                stat_result=st,
             )
 
     raise HTTPException(status_code=404, detail=f"File '{file_id}' not found")
@@ -478,15 +718,14 @@ async def process_pdf(
     - add_full_structure: Add comprehensive structure
     """
     # Save uploaded file
-    file_id = f"{os.urandom(8).hex()}_{file.filename}"
+    file_id = f"{secrets.token_hex(8)}_{safe_filename(file.filename)}"
     input_path = UPLOAD_DIR / file_id
 
-    with open(input_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    await save_upload(file, input_path)
+    uploaded_ids.add(file_id)
 
     # Determine output path
-    output_id = f"{os.urandom(8).hex()}_accessible_{file.filename}"
+    output_id = f"{secrets.token_hex(8)}_accessible_{safe_filename(file.filename)}"
     output_path = OUTPUT_DIR / output_id
 
     # Build arguments based on operation
@@ -511,16 +750,14 @@ async def process_pdf(
     try:
         result = await call_tool(operation, arguments)
 
-        if result and hasattr(result[0], 'text'):
-            try:
-                parsed = json.loads(result[0].text)
-            except json.JSONDecodeError:
-                parsed = {"raw_result": result[0].text}
+        if result and isinstance(result[0], TextContent):
+            parsed = _parse_tool_text(result[0].text)
         else:
             parsed = {"raw_result": str(result)}
 
         # Add download info if output file exists
         if output_path.exists():
+            output_ids.add(output_id)
             parsed["download_url"] = f"/download/{output_id}"
             parsed["output_file_id"] = output_id
 
@@ -554,24 +791,22 @@ async def process_latex(
     - make_latex_accessible: Full pipeline (requires PDF)
     """
     # Save LaTeX file
-    tex_id = f"{os.urandom(8).hex()}_{tex_file.filename}"
+    tex_id = f"{secrets.token_hex(8)}_{safe_filename(tex_file.filename)}"
     tex_path = UPLOAD_DIR / tex_id
 
-    with open(tex_path, "wb") as f:
-        content = await tex_file.read()
-        f.write(content)
+    await save_upload(tex_file, tex_path)
+    uploaded_ids.add(tex_id)
 
     # Save PDF if provided
     pdf_path = None
     if pdf_file:
-        pdf_id = f"{os.urandom(8).hex()}_{pdf_file.filename}"
+        pdf_id = f"{secrets.token_hex(8)}_{safe_filename(pdf_file.filename)}"
         pdf_path = UPLOAD_DIR / pdf_id
-        with open(pdf_path, "wb") as f:
-            content = await pdf_file.read()
-            f.write(content)
+        await save_upload(pdf_file, pdf_path)
+        uploaded_ids.add(pdf_id)
 
     # Output path
-    output_id = f"{os.urandom(8).hex()}_accessible_{tex_file.filename}"
+    output_id = f"{secrets.token_hex(8)}_accessible_{safe_filename(tex_file.filename)}"
     output_path = OUTPUT_DIR / output_id
 
     # Build arguments
@@ -597,15 +832,13 @@ async def process_latex(
     try:
         result = await call_tool(operation, arguments)
 
-        if result and hasattr(result[0], 'text'):
-            try:
-                parsed = json.loads(result[0].text)
-            except json.JSONDecodeError:
-                parsed = {"raw_result": result[0].text}
+        if result and isinstance(result[0], TextContent):
+            parsed = _parse_tool_text(result[0].text)
         else:
             parsed = {"raw_result": str(result)}
 
         if output_path.exists():
+            output_ids.add(output_id)
             parsed["download_url"] = f"/download/{output_id}"
             parsed["output_file_id"] = output_id
 
@@ -633,8 +866,11 @@ async def get_openapi_tools():
     Get tool definitions in various function calling formats.
     This can be used by MorphMind agents to discover and use these tools.
     """
-    tools = await list_tools()
+    return Response(content=app.state.openapi_tools_json, media_type="application/json")
+
 
+def build_openapi_tools(tools: list) -> dict:
+    """Build the /openapi-tools payload (computed once at startup)."""
     # Convert to OpenAI function format
     openai_format = []
     for tool in tools:
@@ -680,4 +916,5 @@ if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     host = os.environ.get("HOST", "0.0.0.0")
 
-    uvicorn.run(app, host=host, port=port)
+    # With uvicorn[standard] installed, "auto" selects uvloop and httptools
+    uvicorn.run(app, host=host, port=port, loop="auto", http="auto")
@@ -10,11 +10,13 @@ Security:
 """
 
 import asyncio
+import hmac
 import json
 import os
 import secrets
 import uuid
 from datetime import datetime, timedelta
+from collections import OrderedDict
 from typing import Any, Optional
 from contextlib import asynccontextmanager
 
@@ -22,6 +24,12 @@ from fastapi import FastAPI, HTTPException, Request, Response, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
+from mcp.types import TextContent
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; falls back to the stdlib codec
+    orjson = None
 
 # Import the MCP server components
 from src.mcp_server import server, list_tools, call_tool
@@ -33,33 +41,50 @@ from src.mcp_server import server, list_tools, call_tool
 
 # API Keys for authentication (in production, use database/secrets manager)
 # Generate with: python -c "import secrets; print(secrets.token_urlsafe(32))"
-VALID_API_KEYS = set(os.environ.get("MCP_API_KEYS", "").split(",")) - {""}
+VALID_API_KEYS: frozenset[str] = frozenset(
+    key for key in os.environ.get("MCP_API_KEYS", "").split(",") if key
+)
 
 # Allowed origins (for CORS and DNS rebinding protection)
 ALLOWED_ORIGINS = os.environ.get("MCP_ALLOWED_ORIGINS", "").split(",")
 
-# Session management
-sessions: dict[str, dict] = {}  # session_id -> {created_at, last_used, initialized}
+# Session management (ordered least- to most-recently used)
+sessions: OrderedDict[str, dict] = OrderedDict()  # session_id -> {created_at, last_used, initialized}
 SESSION_TIMEOUT = timedelta(hours=1)
+MAX_SESSIONS = 10_000
+SESSION_GC_INTERVAL = 60  # seconds
+
+# SSE keep-alive, sent every SSE_PING_INTERVAL seconds on GET /mcp streams
+SSE_PING = b"event: ping\ndata: {}\n\n"
+SSE_PING_INTERVAL = 30
 
 
 # ============================================
 # Authentication
 # ============================================
 
+def is_valid_api_key(candidate: str) -> bool:
+    """Compare against every configured key in constant time per key."""
+    candidate_bytes = candidate.encode()
+    valid = False
+    for key in VALID_API_KEYS:
+        valid |= hmac.compare_digest(candidate_bytes, key.encode())
+    return valid
+
+
 async def verify_api_key(
     x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
     authorization: Optional[str] = Header(None),
 ) -> str:
     """Verify API key from header."""
     # Check X-API-Key header
-    if x_api_key and x_api_key in VALID_API_KEYS:
+    if x_api_key and is_valid_api_key(x_api_key):
         return x_api_key
 
     # Check Authorization: Bearer <key>
     if authorization and authorization.startswith("Bearer "):
         token = authorization[7:]
-        if token in VALID_API_KEYS:
+        if is_valid_api_key(token):
             return token
 
     # If no API keys configured, allow all (for development)
@@ -100,6 +125,9 @@ def create_session() -> str:
         "last_used": datetime.utcnow(),
         "initialized": False,
     }
+    # Evict the least recently used sessions beyond the cap
+    while len(sessions) > MAX_SESSIONS:
+        sessions.popitem(last=False)
     return session_id
 
 
@@ -114,20 +142,28 @@ def get_session(session_id: str) -> Optional[dict]:
         return None
 
     session["last_used"] = datetime.utcnow()
+    sessions.move_to_end(session_id)
     return session
 
 
 def cleanup_sessions():
     """Remove expired sessions."""
     now = datetime.utcnow()
-    expired = [
-        sid for sid, s in sessions.items()
-        if now - s["last_used"] > SESSION_TIMEOUT
-    ]
-    for sid in expired:
+    # Sessions are in last-used order, so stop at the first live one
+    while sessions:
+        sid, s = next(iter(sessions.items()))
+        if now - s["last_used"] <= SESSION_TIMEOUT:
+            break
         del sessions[sid]
 
 
+async def session_gc():
+    """Periodically remove expired sessions."""
+    while True:
+        await asyncio.sleep(SESSION_GC_INTERVAL)
+        cleanup_sessions()
+
+
 # ============================================
 # FastAPI Application
 # ============================================
@@ -139,8 +175,23 @@ async def lifespan(app: FastAPI):
     print("MCP HTTP Transport Server starting...")
     if not VALID_API_KEYS:
         print("WARNING: No API keys configured. Running in development mode.")
+
+    # Tool definitions are static, so the tools/list result is built once
+    app.state.tools_list_result = {
+        "tools": [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "inputSchema": tool.inputSchema,
+            }
+            for tool in await list_tools()
+        ]
+    }
+    app.state.tools_list_result_json = _json_bytes(app.state.tools_list_result)
+    gc_task = asyncio.create_task(session_gc())
     yield
     # Shutdown
+    gc_task.cancel()
     sessions.clear()
 
 
@@ -187,10 +238,10 @@ async def mcp_get(
 
     # Return SSE stream (for now, just acknowledge - extend for server push)
     async def event_stream():
-        # Keep connection alive with periodic pings
-        while True:
-            yield f"event: ping\ndata: {json.dumps({'timestamp': datetime.utcnow().isoformat()})}\n\n"
-            await asyncio.sleep(30)
+        # Keep connection alive with periodic pings until the client goes away
+        while not await request.is_disconnected():
+            yield SSE_PING
+            await asyncio.sleep(SSE_PING_INTERVAL)
 
     return StreamingResponse(
         event_stream(),
@@ -198,10 +249,102 @@ async def mcp_get(
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Don't let nginx buffer the stream
         }
     )
 
 
+def _initialize_response(req_id: Any) -> dict:
+    """Return server capabilities for an initialize request."""
+    return {
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "result": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {
+                "tools": {"listChanged": False},
+            },
+            "serverInfo": {
+                "name": "accessibility-mcp",
+                "version": "1.0.0",
+            },
+        }
+    }
+
+
+def _json_bytes(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes (orjson when available)."""
+    return orjson.dumps(obj) if orjson else json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _tools_list_response_json(req_id: Any) -> bytes:
+    """Splice a request id into the prebuilt tools/list payload."""
+    return b"".join((
+        b'{"jsonrpc":"2.0","id":',
+        _json_bytes(req_id),
+        b',"result":',
+        app.state.tools_list_result_json,
+        b"}",
+    ))
+
+
+async def _handle_tools_list(req_id: Any, params: dict) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "result": app.state.tools_list_result,
+    }
+
+
+async def _handle_tools_call(req_id: Any, params: dict) -> dict:
+    tool_name = params.get("name")
+    arguments = params.get("arguments", {})
+
+    try:
+        result = await call_tool(tool_name, arguments)
+
+        # Extract text content from result
+        content = [
+            {"type": "text", "text": item.text}
+            for item in result or ()
+            if isinstance(item, TextContent)
+        ]
+
+        return {
+            "jsonrpc": "2.0",
+            "id": req_id,
+            "result": {
+                "content": content,
+                "isError": False,
+            }
+        }
+    except Exception as e:
+        return {
+            "jsonrpc": "2.0",
+            "id": req_id,
+            "result": {
+                "content": [{"type": "text", "text": str(e)}],
+                "isError": True,
+            }
+        }
+
+
+async def _handle_ping(req_id: Any, params: dict) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "result": {}
+    }
+
+
+# JSON-RPC method -> handler(req_id, params) returning the response dict
+MCP_HANDLERS = {
+    "tools/list": _handle_tools_list,
+    "tools/call": _handle_tools_call,
+    "ping": _handle_ping,
+}
+
+
 @app.post("/mcp")
 async def mcp_post(
     request: Request,
@@ -214,11 +357,11 @@ async def mcp_post(
     This is the main MCP communication endpoint.
     """
     validate_origin(request)
-    cleanup_sessions()
 
     # Parse JSON-RPC request
     try:
-        body = await request.json()
+        raw_body = await request.body()
+        body = orjson.loads(raw_body) if orjson else json.loads(raw_body)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON")
 
@@ -228,117 +371,56 @@ async def mcp_post(
 
     responses = []
     new_session_id = None
+    pending = []  # (response slot, request id, handler coroutine)
 
     for req in requests:
         method = req.get("method")
         params = req.get("params", {})
         req_id = req.get("id")
 
-        # Handle initialization
+        # Initialization creates the session, so it is handled inline
         if method == "initialize":
-            # Create new session
             new_session_id = create_session()
             sessions[new_session_id]["initialized"] = True
+            responses.append(_initialize_response(req_id))
+            continue
 
-            # Return server capabilities
-            response = {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {
-                    "protocolVersion": "2025-03-26",
-                    "capabilities": {
-                        "tools": {"listChanged": False},
-                    },
-                    "serverInfo": {
-                        "name": "accessibility-mcp",
-                        "version": "1.0.0",
-                    },
-                }
-            }
-            responses.append(response)
-
-        # Handle initialized notification
-        elif method == "notifications/initialized":
-            # No response needed for notifications
-            pass
+        # A lone tools/list is answered from the pre-serialized tool schemas
+        if method == "tools/list" and not is_batch:
+            return Response(content=_tools_list_response_json(req_id), media_type="application/json")
 
-        # Handle tools/list
-        elif method == "tools/list":
-            tools = await list_tools()
-            response = {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {
-                    "tools": [
-                        {
-                            "name": tool.name,
-                            "description": tool.description,
-                            "inputSchema": tool.inputSchema,
-                        }
-                        for tool in tools
-                    ]
-                }
-            }
-            responses.append(response)
-
-        # Handle tools/call
-        elif method == "tools/call":
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-
-            try:
-                result = await call_tool(tool_name, arguments)
-
-                # Extract content from result
-                content = []
-                if result:
-                    for item in result:
-                        if hasattr(item, 'text'):
-                            content.append({
-                                "type": "text",
-                                "text": item.text,
-                            })
-
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": req_id,
-                    "result": {
-                        "content": content,
-                        "isError": False,
-                    }
-                }
-            except Exception as e:
-                response = {
-                    "jsonrpc": "2.0",
-                    "id": req_id,
-                    "result": {
-                        "content": [{"type": "text", "text": str(e)}],
-                        "isError": True,
-                    }
-                }
-
-            responses.append(response)
-
-        # Handle ping
-        elif method == "ping":
-            response = {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {}
-            }
-            responses.append(response)
-
-        # Unknown method
+        handler = MCP_HANDLERS.get(method)
+        if handler is not None:
+            responses.append(None)  # Filled in once the handler completes
+            pending.append((len(responses) - 1, req_id, handler(req_id, params)))
         elif req_id is not None:  # Only respond to requests, not notifications
-            response = {
+            responses.append({
                 "jsonrpc": "2.0",
                 "id": req_id,
                 "error": {
                     "code": -32601,
                     "message": f"Method not found: {method}",
                 }
-            }
-            responses.append(response)
+            })
+        # Notifications (e.g. notifications/initialized) need no response
+
+    # Run the batch's handlers concurrently; responses keep request order
+    if pending:
+        results = await asyncio.gather(
+            *(coro for _, _, coro in pending),
+            return_exceptions=True,
+        )
+        for (slot, req_id, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                result = {
+                    "jsonrpc": "2.0",
+                    "id": req_id,
+                    "error": {
+                        "code": -32603,
+                        "message": f"Internal error: {result}",
+                    }
+                }
+            responses[slot] = result
 
     # Build response
     if not responses:
@@ -352,6 +434,8 @@ async def mcp_post(
     if new_session_id:
         headers["Mcp-Session-Id"] = new_session_id
 
+    if orjson:
+        return Response(content=orjson.dumps(result), media_type="application/json", headers=headers)
     return JSONResponse(content=result, headers=headers)
 
 
@@ -410,4 +494,5 @@ if __name__ == "__main__":
     print(f"Starting MCP HTTP Transport on {host}:{port}")
     print(f"MCP endpoint: http://{host}:{port}/mcp")
 
-    uvicorn.run(app, host=host, port=port)
+    # With uvicorn[standard] installed, "auto" selects uvloop and httptools
+    uvicorn.run(app, host=host, port=port, loop="auto", http="auto")
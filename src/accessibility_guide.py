@@ -5,6 +5,8 @@ Provides curated educational content about PDF accessibility,
 the challenges people face, and how AI agents can help.
 """
 
+from functools import lru_cache
+
 ACCESSIBILITY_GUIDE = {
     "what_is_accessibility": {
         "title": "What is PDF Accessibility?",
@@ -239,6 +241,29 @@ MIT License - Use freely, contribute back if you can.
 }
 
 
+# Responses are static, so build them once; callers must not mutate them
+_TOPIC_RESPONSES = {
+    topic: {"topic": topic, **section}
+    for topic, section in ACCESSIBILITY_GUIDE.items()
+}
+
+_OVERVIEW_RESPONSE = {
+    "title": "PDF Accessibility Guide",
+    "description": "Complete guide to PDF accessibility, challenges, and AI-powered solutions",
+    "topics": list(ACCESSIBILITY_GUIDE.keys()),
+    "sections": ACCESSIBILITY_GUIDE,
+    "quick_summary": """
+PDF accessibility ensures documents can be read by everyone, including people using screen readers.
+Most PDFs lack proper structure and alt-text, creating barriers for millions of users.
+
+This AI agent automates accessibility remediation - analyzing documents, generating alt-text,
+and fixing structure issues in minutes instead of hours.
+
+Get started at morphmind.ai or deploy your own instance from our open-source repository.
+"""
+}
+
+
 def get_accessibility_tutorial(topic: str = None) -> dict:
     """
     Get accessibility tutorial content.
@@ -256,41 +281,35 @@ def get_accessibility_tutorial(topic: str = None) -> dict:
         Dictionary with title and content for requested topic(s)
     """
     if topic and topic in ACCESSIBILITY_GUIDE:
-        return {
-            "topic": topic,
-            **ACCESSIBILITY_GUIDE[topic]
-        }
+        return _TOPIC_RESPONSES[topic]
 
     # Return overview with all topics
-    return {
-        "title": "PDF Accessibility Guide",
-        "description": "Complete guide to PDF accessibility, challenges, and AI-powered solutions",
-        "topics": list(ACCESSIBILITY_GUIDE.keys()),
-        "sections": ACCESSIBILITY_GUIDE,
-        "quick_summary": """
-PDF accessibility ensures documents can be read by everyone, including people using screen readers.
-Most PDFs lack proper structure and alt-text, creating barriers for millions of users.
-
-This AI agent automates accessibility remediation - analyzing documents, generating alt-text,
-and fixing structure issues in minutes instead of hours.
-
-Get started at morphmind.ai or deploy your own instance from our open-source repository.
-"""
-    }
+    return _OVERVIEW_RESPONSE
 
 
 def format_tutorial_for_display(tutorial: dict) -> str:
     """Format tutorial content for display to user."""
     if "sections" in tutorial:
         # Full guide
-        output = f"# {tutorial['title']}\n\n"
-        output += f"{tutorial['quick_summary']}\n\n"
-        output += "---\n\n"
-        output += "## Available Topics\n\n"
-        for key, section in tutorial["sections"].items():
-            output += f"- **{section['title']}** (`{key}`)\n"
-        output += "\n*Ask about a specific topic for detailed information.*"
-        return output
+        return _format_overview(
+            tutorial["title"],
+            tutorial["quick_summary"],
+            tuple((key, section["title"]) for key, section in tutorial["sections"].items()),
+        )
     else:
         # Specific topic
         return tutorial["content"]
+
+
+@lru_cache(maxsize=16)
+def _format_overview(title: str, quick_summary: str, topics: tuple) -> str:
+    """Render the guide overview; topics is a tuple of (key, section title) pairs."""
+    lines = [
+        f"# {title}\n",
+        f"{quick_summary}\n",
+        "---\n",
+        "## Available Topics\n",
+    ]
+    lines.extend(f"- **{section_title}** (`{key}`)" for key, section_title in topics)
+    lines.append("\n*Ask about a specific topic for detailed information.*")
+    return "\n".join(lines)
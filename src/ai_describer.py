@@ -7,22 +7,43 @@ Uses:
 - Combined approach for comprehensive accessibility
 """
 
-import google.generativeai as genai
 from pathlib import Path
 from typing import Optional, List, Tuple
-import base64
+import hashlib
+import json
 import os
 import io
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Gemini 2.0 Flash (supports vision)
+GEMINI_MODEL = "gemini-2.0-flash"
+_configured_key: Optional[str] = None
+
+# Gemini SDK (lazy loaded; importing it pulls in grpc)
+_genai = None
+
 # OCR imports (lazy loaded)
 _pytesseract = None
 _Image = None
 
 
+def _load_genai():
+    """Lazy load the Gemini SDK."""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        _genai = genai
+    return _genai
+
+
 def _load_ocr():
     """Lazy load OCR dependencies."""
     global _pytesseract, _Image
@@ -37,6 +58,32 @@ def _load_ocr():
     return _pytesseract, _Image
 
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _decode_image(image_data: bytes):
+    """Decode image bytes into a loaded PIL image for OCR."""
+    _, Image = _load_ocr()
+    img = Image.open(io.BytesIO(image_data))
+    img.load()
+    return img
+
+
+def _decode_for_ocr(image_data: bytes):
+    """
+    Decode image bytes once for a request's OCR and color checks.
+
+    Returns None when OCR is unavailable or the bytes are not an image.
+    """
+    pytesseract, _ = _load_ocr()
+    if pytesseract is None:
+        return None
+    try:
+        return _decode_image(image_data)
+    except Exception:
+        return None
+
+
 def extract_text_ocr(image_data: bytes) -> str:
     """
     Extract text from an image using Tesseract OCR.
@@ -47,21 +94,33 @@ def extract_text_ocr(image_data: bytes) -> str:
     Returns:
         Extracted text string, or empty string if OCR fails/unavailable
     """
-    pytesseract, Image = _load_ocr()
+    pytesseract, _ = _load_ocr()
     if pytesseract is None:
         return ""
 
     try:
-        img = Image.open(io.BytesIO(image_data))
+        img = _decode_image(image_data)
         # Use Tesseract to extract text
         text = pytesseract.image_to_string(img, lang='eng')
         # Clean up the text
-        text = ' '.join(text.split())  # Normalize whitespace
+        text = _WHITESPACE_RE.sub(" ", text)  # Normalize whitespace
         return text.strip()
     except Exception as e:
         return ""
 
 
+# Tesseract page segmentation modes tried by extract_text_with_confidence, in order:
+# 6 = Assume uniform block of text
+# 3 = Fully automatic (default)
+# 4 = Single column of text
+# 11 = Sparse text
+OCR_PSM_CONFIGS = ("--psm 6", "--psm 3", "--psm 4", "--psm 11")
+
+# extract_text_with_confidence stops trying PSM modes once a result clears both
+OCR_GOOD_CONFIDENCE = 0.85
+OCR_GOOD_LENGTH = 40
+
+
 def extract_text_with_confidence(image_data: bytes) -> Tuple[str, float]:
     """
     Extract text from an image with confidence score.
@@ -71,44 +130,49 @@ def extract_text_with_confidence(image_data: bytes) -> Tuple[str, float]:
     Returns:
         Tuple of (extracted_text, average_confidence)
     """
-    pytesseract, Image = _load_ocr()
+    img = _decode_for_ocr(image_data)
+    if img is None:
+        return "", 0.0
+    return _text_with_confidence(img)
+
+
+def _text_with_confidence(img) -> Tuple[str, float]:
+    """extract_text_with_confidence for an image that is already decoded."""
+    pytesseract, _ = _load_ocr()
     if pytesseract is None:
         return "", 0.0
 
     try:
-        img = Image.open(io.BytesIO(image_data))
+        # Tesseract binarizes anyway; images with alpha are left alone
+        if img.mode == "RGB":
+            img = img.convert("L")
 
         # Try multiple PSM modes and pick the best result
         best_text = ""
         best_conf = 0.0
 
-        # PSM modes to try:
-        # 3 = Fully automatic (default)
-        # 4 = Single column of text
-        # 6 = Assume uniform block of text
-        # 11 = Sparse text
-        for psm in [6, 3, 4, 11]:
+        image_to_data = pytesseract.image_to_data
+        dict_output = pytesseract.Output.DICT
+
+        for config in OCR_PSM_CONFIGS:
             try:
-                config = f'--psm {psm}'
-                data = pytesseract.image_to_data(
+                data = image_to_data(
                     img, lang='eng',
-                    output_type=pytesseract.Output.DICT,
+                    output_type=dict_output,
                     config=config
                 )
+                words_col, conf_col = data['text'], data['conf']
 
-                texts = []
-                confidences = []
+                # Keep non-empty words with a valid confidence, in one pass
+                words = [
+                    (word, conf)
+                    for word, conf in zip(words_col, map(int, conf_col))
+                    if conf > 0 and word.strip()
+                ]
 
-                for i, word in enumerate(data['text']):
-                    if word.strip():
-                        conf = int(data['conf'][i])
-                        if conf > 0:  # Valid confidence
-                            texts.append(word)
-                            confidences.append(conf)
-
-                if texts:
-                    text = ' '.join(texts)
-                    avg_conf = sum(confidences) / len(confidences) / 100.0
+                if words:
+                    text = ' '.join(word for word, _ in words)
+                    avg_conf = sum(conf for _, conf in words) / len(words) / 100.0
 
                     # Keep the result with most text if confidence is reasonable
                     if len(text) > len(best_text) and avg_conf > 0.3:
@@ -117,6 +181,10 @@ def extract_text_with_confidence(image_data: bytes) -> Tuple[str, float]:
                     elif avg_conf > best_conf and len(text) > len(best_text) * 0.7:
                         best_text = text
                         best_conf = avg_conf
+
+                    # Confident and substantial: the remaining modes rarely do better
+                    if best_conf > OCR_GOOD_CONFIDENCE and len(best_text) > OCR_GOOD_LENGTH:
+                        break
             except Exception:
                 continue
 
@@ -125,12 +193,234 @@ def extract_text_with_confidence(image_data: bytes) -> Tuple[str, float]:
         return "", 0.0
 
 
-def configure_gemini(api_key: Optional[str] = None):
-    """Configure the Gemini API with the provided key."""
+def load_image_for_description(image_path: Path, max_dim: int = 1024) -> bytes:
+    """
+    Read an image file for alt-text generation, downsampling large images.
+
+    Vision models scale inputs down to about 1024px anyway, so sending the
+    full-resolution file only costs memory and upload time. Files Pillow
+    cannot open (e.g. PDF or EPS figures) are returned unchanged.
+
+    Args:
+        image_path: Path to the image file
+        max_dim: Maximum width/height of the returned image
+
+    Returns:
+        Image bytes (PNG if downsampled, original bytes otherwise)
+    """
+    try:
+        from PIL import Image
+        with Image.open(image_path) as img:  # Only reads the header
+            if max(img.size) > max_dim:
+                img.thumbnail((max_dim, max_dim))
+                buffer = io.BytesIO()
+                img.save(buffer, format="PNG")
+                return buffer.getvalue()
+    except Exception:
+        pass
+    return Path(image_path).read_bytes()
+
+
+def configure_gemini(api_key: Optional[str] = None) -> str:
+    """Configure the Gemini API with the provided key and return the key used."""
+    global _configured_key
     key = api_key or os.getenv("GEMINI_API_KEY")
     if not key:
         raise ValueError("GEMINI_API_KEY not found. Set it in .env or pass directly.")
-    genai.configure(api_key=key)
+    # Reconfiguring drops the SDK's cached clients, so only do it when the key changes
+    if key != _configured_key:
+        _load_genai().configure(api_key=key)
+        _configured_key = key
+    return key
+
+
+@lru_cache(maxsize=4)
+def _get_model(model_name: str, key_fingerprint: str):
+    """Cached GenerativeModel per (model, API key); the fingerprint keeps the key out of the cache."""
+    return _load_genai().GenerativeModel(model_name)
+
+
+def _key_fingerprint(key: str) -> str:
+    """Short non-reversible tag identifying an API key."""
+    return hashlib.sha1(key.encode()).hexdigest()[:8]
+
+
+def get_gemini_model(api_key: Optional[str] = None, model_name: str = GEMINI_MODEL):
+    """Configure Gemini and return a reusable model instance for the key."""
+    key = configure_gemini(api_key)
+    return _get_model(model_name, _key_fingerprint(key))
+
+
+# generate_alt_text uses OCR text directly for figures that are just text
+OCR_PASSTHROUGH_CONFIDENCE = 0.9
+OCR_PASSTHROUGH_LENGTH = 80
+
+
+def _looks_like_chart(img) -> bool:
+    """
+    Cheap check for graphical content in a decoded image (None if it could
+    not be decoded): many distinct colors, or a visible share of saturated
+    color. Text blocks are near-monochrome. Errs towards True.
+    """
+    if img is None:
+        return True
+    try:
+        colors = img.convert("RGB").getcolors(256)
+    except Exception:
+        return True
+    if colors is None:  # More than 256 colors
+        return True
+    min_pixels = img.width * img.height // 100
+    return any(
+        max(rgb) - min(rgb) > 60 and count > min_pixels
+        for count, rgb in colors
+    )
+
+
+class AltTextCache:
+    """
+    Thread-safe LRU cache of generated alt-text keyed by image digest and
+    prompt inputs. Failed generations are never stored.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+alt_text_cache = AltTextCache()
+
+
+# Static prompt scaffolding; only the document type, OCR text and context vary per call
+ALT_TEXT_PROMPT_HEAD = """You are an expert at writing accessible alt-text for images in {document_type}s.
+
+Generate a concise but descriptive alt-text for this image that would help a blind or visually impaired reader understand:
+1. What type of figure this is (graph, diagram, photo, chart, etc.)
+2. The key information or data being conveyed
+3. Any important trends, relationships, or conclusions visible
+
+Guidelines for alt-text:
+- Be concise but informative (aim for 1-3 sentences)
+- Don't start with "Image of" or "Picture of" - just describe the content
+- For graphs/charts: describe the type, axes, and main trends
+- For diagrams: describe the structure and key components
+- For photos: describe the subject and relevant details
+- Include specific numbers/data if they're important to understanding
+- If there is text in the image, include the key text content"""
+
+ALT_TEXT_OCR_TEMPLATE = """
+Text extracted from the image via OCR:
+\"\"\"{ocr_text}\"\"\"
+
+Please incorporate this text into your description where relevant."""
+
+ALT_TEXT_PROMPT_TAIL = "Respond with ONLY the alt-text, no additional commentary or formatting."
+
+FORMULA_PROMPT_HEAD = """You are an expert at describing mathematical formulas for blind and visually impaired users.
+
+Describe this mathematical content in plain English that a screen reader user can understand.
+
+Guidelines:
+- For MATRICES: State the dimensions (e.g., "3 by 2 matrix"), then read the values row by row
+  Example: "A 3 by 2 matrix. Row 1: 16,000 and 23. Row 2: 33,000 and 47. Row 3: 21,000 and 35."
+- For EQUATIONS: Read left to right, spell out operations
+  Example: "x equals negative b plus or minus the square root of b squared minus 4ac, all over 2a"
+- For INTEGRALS: Describe the integral sign, limits, and integrand
+  Example: "The integral from 0 to infinity of e to the negative x squared dx"
+- For SUMMATIONS: Describe the sigma notation and terms
+  Example: "The sum from i equals 1 to n of x sub i"
+- For FRACTIONS: Use "over" or "divided by"
+- For SUBSCRIPTS/SUPERSCRIPTS: Use "sub" and "to the power of" or "squared"/"cubed"
+- For GREEK LETTERS: Name them (alpha, beta, gamma, etc.)
+
+Be concise but complete. Include all values and symbols."""
+
+FORMULA_PROMPT_TAIL = "Respond with ONLY the description, no additional commentary."
+
+
+ALT_TEXT_GROUP_PROMPT = """You are an expert at writing accessible alt-text for images in {document_type}s.
+
+You will be given {count} images, each preceded by a label "Image N:" and sometimes context from the document
+or text extracted from the image via OCR.
+For each image, write a concise but descriptive alt-text (1-3 sentences) that would help a blind or visually impaired reader understand:
+1. What type of figure this is (graph, diagram, photo, chart, etc.)
+2. The key information or data being conveyed
+3. Any important trends, relationships, or conclusions visible
+
+Don't start with "Image of" or "Picture of". Include key text and numbers shown in the image.
+
+Respond with ONLY a JSON array of {count} strings, one alt-text per image, in order."""
+
+# Gemini sometimes wraps JSON answers in a ```json fence
+_CODE_FENCE_RE = re.compile(r"^```(?:json)?|```$", re.MULTILINE)
+
+
+@lru_cache(maxsize=8)
+def _alt_text_prompt_head(document_type: str) -> str:
+    """ALT_TEXT_PROMPT_HEAD filled in for a document type (few distinct values)."""
+    return ALT_TEXT_PROMPT_HEAD.format(document_type=document_type)
+
+
+def _alt_text_cache_key(
+    image_data: bytes,
+    context: str,
+    document_type: str,
+    include_ocr: bool,
+    fast_ocr_passthrough: bool,
+) -> tuple:
+    """alt_text_cache key for an image and the inputs that shape its prompt."""
+    return (
+        hashlib.blake2b(image_data, digest_size=16).digest(),
+        context, document_type, include_ocr, fast_ocr_passthrough,
+    )
+
+
+def _ocr_for_prompt(
+    image_data: bytes,
+    ocr_result: Optional[Tuple[str, float]],
+    fast_ocr_passthrough: bool,
+    img=None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Run (or reuse) OCR for an alt-text prompt.
+
+    `img` is the image already decoded by the caller, if any; otherwise it
+    is decoded here at most once for both OCR and the color check.
+
+    Returns (ocr_text, passthrough): the OCR text to include in the prompt,
+    and the finished alt-text when the image is plainly just text (very
+    confident OCR, few colors) so Gemini can be skipped.
+    """
+    if ocr_result is None:
+        if img is None:
+            img = _decode_for_ocr(image_data)
+        ocr_result = _text_with_confidence(img) if img is not None else ("", 0.0)
+    ocr_text, confidence = ocr_result
+    if (fast_ocr_passthrough and confidence > OCR_PASSTHROUGH_CONFIDENCE
+            and len(ocr_text) > OCR_PASSTHROUGH_LENGTH):
+        if img is None:
+            img = _decode_for_ocr(image_data)
+        if not _looks_like_chart(img):
+            # A pure-text figure: OCR already has the content, no API round trip needed
+            return "", f"Text content: {ocr_text[:500]}"
+    if ocr_text and confidence > 0.5:  # Only use if reasonably confident
+        ocr_text = ocr_text[:500]  # Limit length
+    return ocr_text, None
 
 
 def generate_alt_text(
@@ -139,6 +429,8 @@ def generate_alt_text(
     document_type: str = "academic paper",
     api_key: Optional[str] = None,
     include_ocr: bool = True,
+    ocr_result: Optional[Tuple[str, float]] = None,
+    fast_ocr_passthrough: bool = True,
 ) -> str:
     """
     Generate alt-text for an image using Gemini Vision and optional OCR.
@@ -149,55 +441,43 @@ def generate_alt_text(
         document_type: Type of document for context (e.g., "academic paper", "textbook")
         api_key: Optional API key (uses env var if not provided)
         include_ocr: Whether to extract and include OCR text (default: True)
+        ocr_result: Already computed (text, confidence) from extract_text_with_confidence,
+            used instead of running OCR again
+        fast_ocr_passthrough: Skip Gemini for images that are plainly just text
+            (very confident OCR, few colors) and use the OCR text as the alt-text
 
     Returns:
         Generated alt-text string
     """
-    configure_gemini(api_key)
+    model = get_gemini_model(api_key)
+
+    # Repeated figures (logos, page headers) are only described once
+    cache_key = _alt_text_cache_key(image_data, context, document_type, include_ocr, fast_ocr_passthrough)
+    cached = alt_text_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     # Extract OCR text if enabled
     ocr_text = ""
     if include_ocr:
-        ocr_text, confidence = extract_text_with_confidence(image_data)
-        if ocr_text and confidence > 0.5:  # Only use if reasonably confident
-            ocr_text = ocr_text[:500]  # Limit length
-
-    # Use Gemini 2.0 Flash (supports vision)
-    model = genai.GenerativeModel("gemini-2.0-flash")
+        ocr_text, passthrough = _ocr_for_prompt(image_data, ocr_result, fast_ocr_passthrough)
+        if passthrough is not None:
+            alt_text_cache.put(cache_key, passthrough)
+            return passthrough
 
     # Build the prompt for accessible alt-text
-    ocr_section = ""
+    parts = [_alt_text_prompt_head(document_type)]
     if ocr_text:
-        ocr_section = f"""
-Text extracted from the image via OCR:
-\"\"\"{ocr_text}\"\"\"
-
-Please incorporate this text into your description where relevant."""
-
-    prompt = f"""You are an expert at writing accessible alt-text for images in {document_type}s.
-
-Generate a concise but descriptive alt-text for this image that would help a blind or visually impaired reader understand:
-1. What type of figure this is (graph, diagram, photo, chart, etc.)
-2. The key information or data being conveyed
-3. Any important trends, relationships, or conclusions visible
-
-Guidelines for alt-text:
-- Be concise but informative (aim for 1-3 sentences)
-- Don't start with "Image of" or "Picture of" - just describe the content
-- For graphs/charts: describe the type, axes, and main trends
-- For diagrams: describe the structure and key components
-- For photos: describe the subject and relevant details
-- Include specific numbers/data if they're important to understanding
-- If there is text in the image, include the key text content
-{ocr_section}
-{f"Context from the document: {context}" if context else ""}
-
-Respond with ONLY the alt-text, no additional commentary or formatting."""
+        parts.append(ALT_TEXT_OCR_TEMPLATE.format(ocr_text=ocr_text))
+    if context:
+        parts.append(f"\nContext from the document: {context}")
+    parts.append(f"\n{ALT_TEXT_PROMPT_TAIL}")
+    prompt = "\n".join(parts)
 
     # Create the image part
     image_part = {
         "mime_type": "image/png",
-        "data": base64.b64encode(image_data).decode("utf-8"),
+        "data": image_data,  # The SDK encodes raw bytes itself
     }
 
     try:
@@ -207,6 +487,7 @@ Respond with ONLY the alt-text, no additional commentary or formatting."""
         # Clean up any potential quotes or extra formatting
         alt_text = alt_text.strip('"\'')
 
+        alt_text_cache.put(cache_key, alt_text)
         return alt_text
 
     except Exception as e:
@@ -230,13 +511,14 @@ def generate_alt_text_with_ocr(
     # Extract OCR
     ocr_text, confidence = extract_text_with_confidence(image_data)
 
-    # Generate alt-text (OCR already included in the function)
+    # Generate alt-text, reusing the OCR pass above
     alt_text = generate_alt_text(
         image_data=image_data,
         context=context,
         document_type=document_type,
         api_key=api_key,
         include_ocr=True,
+        ocr_result=(ocr_text, confidence),
     )
 
     return {
@@ -249,26 +531,133 @@ def generate_alt_text_with_ocr(
 def generate_alt_texts_batch(
     images: List[dict],
     api_key: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    group_size: int = 8,
+    document_type: str = "academic paper",
+    include_ocr: bool = True,
+    fast_ocr_passthrough: bool = True,
 ) -> List[str]:
     """
     Generate alt-text for multiple images.
 
+    Images are sent to Gemini in groups of up to `group_size` per request,
+    and the groups are described concurrently. Each image gets the same OCR
+    treatment as generate_alt_text(): its text goes into the prompt, and
+    plainly textual images skip Gemini. A group whose response cannot be
+    parsed falls back to one generate_alt_text() call per image; so does
+    everything when group_size is 1. Identical images with identical context
+    are only described once, and results are shared with generate_alt_text()
+    through alt_text_cache.
+
     Args:
         images: List of dicts with 'image_data' and optional 'context'
         api_key: Optional API key
+        max_workers: Concurrent requests (default: min(4, number of groups))
+        group_size: Images per Gemini request
+        document_type: Type of document for context (e.g., "academic paper", "textbook")
+        include_ocr: Whether to extract and include OCR text (default: True)
+        fast_ocr_passthrough: Use the OCR text as the alt-text for images that
+            are plainly just text, as in generate_alt_text()
 
     Returns:
         List of alt-text strings in the same order
     """
-    results = []
-    for img in images:
-        alt_text = generate_alt_text(
-            image_data=img["image_data"],
-            context=img.get("context", ""),
-            api_key=api_key,
-        )
-        results.append(alt_text)
-    return results
+    if not images:
+        return []
+
+    # Configure once up front so worker threads share the cached model
+    get_gemini_model(api_key)
+
+    unique = list(dict.fromkeys((img["image_data"], img.get("context", "")) for img in images))
+    cache_keys = {
+        item: _alt_text_cache_key(item[0], item[1], document_type, include_ocr, fast_ocr_passthrough)
+        for item in unique
+    }
+    described = {}
+    for item in unique:
+        cached = alt_text_cache.get(cache_keys[item])
+        if cached is not None:
+            described[item] = cached
+    pending = [item for item in unique if item not in described]
+
+    def describe(group: List[Tuple[bytes, str]]) -> List[str]:
+        # Each image is decoded once here for both OCR and the color check
+        decoded = [_decode_for_ocr(image_data) if include_ocr else None for image_data, _ in group]
+        ocr_results = [
+            (_text_with_confidence(img) if img is not None else ("", 0.0)) if include_ocr else None
+            for img in decoded
+        ]
+        alt_texts: List[Optional[str]] = [None] * len(group)
+        to_prompt = []  # (position, image_data, context, ocr_text)
+        for position, ((image_data, context), ocr_result) in enumerate(zip(group, ocr_results)):
+            ocr_text = ""
+            if include_ocr:
+                ocr_text, passthrough = _ocr_for_prompt(
+                    image_data, ocr_result, fast_ocr_passthrough, decoded[position],
+                )
+                if passthrough is not None:
+                    alt_texts[position] = passthrough
+                    alt_text_cache.put(cache_keys[group[position]], passthrough)
+                    continue
+            to_prompt.append((position, image_data, context, ocr_text))
+
+        if len(to_prompt) > 1:
+            group_texts = _describe_image_group([item[1:] for item in to_prompt], api_key, document_type)
+            if group_texts is not None:
+                for (position, *_), alt_text in zip(to_prompt, group_texts):
+                    alt_texts[position] = alt_text
+                    alt_text_cache.put(cache_keys[group[position]], alt_text)
+
+        for position, image_data, context, _ in to_prompt:
+            if alt_texts[position] is None:
+                alt_texts[position] = generate_alt_text(
+                    image_data=image_data, context=context, document_type=document_type,
+                    api_key=api_key, include_ocr=include_ocr, ocr_result=ocr_results[position],
+                    fast_ocr_passthrough=fast_ocr_passthrough,
+                )
+        return alt_texts
+
+    if pending:
+        group_size = max(group_size, 1)
+        groups = [pending[i:i + group_size] for i in range(0, len(pending), group_size)]
+        with ThreadPoolExecutor(max_workers=max_workers or min(4, len(groups))) as executor:
+            described.update(zip(pending, (text for texts in executor.map(describe, groups) for text in texts)))
+    return [described[(img["image_data"], img.get("context", ""))] for img in images]
+
+
+def _describe_image_group(
+    group: List[Tuple[bytes, str, str]],
+    api_key: Optional[str] = None,
+    document_type: str = "academic paper",
+) -> Optional[List[str]]:
+    """
+    Describe several (image_data, context, ocr_text) entries in one Gemini request.
+
+    Returns None if the response is not a JSON array with one non-empty
+    string per image.
+    """
+    model = get_gemini_model(api_key)
+
+    parts = [ALT_TEXT_GROUP_PROMPT.format(document_type=document_type, count=len(group))]
+    for number, (image_data, context, ocr_text) in enumerate(group, 1):
+        label = f"Image {number}:"
+        if context:
+            label += f" (context from the document: {context})"
+        if ocr_text:
+            label += f' (text extracted via OCR: """{ocr_text}""")'
+        parts.append(label)
+        parts.append({"mime_type": "image/png", "data": image_data})
+
+    try:
+        response = model.generate_content(parts)
+        alt_texts = json.loads(_CODE_FENCE_RE.sub("", response.text).strip())
+    except Exception:
+        return None
+
+    if not (isinstance(alt_texts, list) and len(alt_texts) == len(group)
+            and all(isinstance(text, str) and text.strip() for text in alt_texts)):
+        return None
+    return [text.strip().strip('"\'') for text in alt_texts]
 
 
 def generate_formula_description(
@@ -290,37 +679,18 @@ def generate_formula_description(
     Returns:
         Human-readable description of the formula
     """
-    configure_gemini(api_key)
+    model = get_gemini_model(api_key)
 
-    # Use Gemini 2.0 Flash (supports vision)
-    model = genai.GenerativeModel("gemini-2.0-flash")
-
-    prompt = f"""You are an expert at describing mathematical formulas for blind and visually impaired users.
-
-Describe this mathematical content in plain English that a screen reader user can understand.
-
-Guidelines:
-- For MATRICES: State the dimensions (e.g., "3 by 2 matrix"), then read the values row by row
-  Example: "A 3 by 2 matrix. Row 1: 16,000 and 23. Row 2: 33,000 and 47. Row 3: 21,000 and 35."
-- For EQUATIONS: Read left to right, spell out operations
-  Example: "x equals negative b plus or minus the square root of b squared minus 4ac, all over 2a"
-- For INTEGRALS: Describe the integral sign, limits, and integrand
-  Example: "The integral from 0 to infinity of e to the negative x squared dx"
-- For SUMMATIONS: Describe the sigma notation and terms
-  Example: "The sum from i equals 1 to n of x sub i"
-- For FRACTIONS: Use "over" or "divided by"
-- For SUBSCRIPTS/SUPERSCRIPTS: Use "sub" and "to the power of" or "squared"/"cubed"
-- For GREEK LETTERS: Name them (alpha, beta, gamma, etc.)
-
-Be concise but complete. Include all values and symbols.
-{f"Context from document: {context}" if context else ""}
-
-Respond with ONLY the description, no additional commentary."""
+    parts = [FORMULA_PROMPT_HEAD]
+    if context:
+        parts.append(f"Context from document: {context}")
+    parts.append(f"\n{FORMULA_PROMPT_TAIL}")
+    prompt = "\n".join(parts)
 
     # Create the image part
     image_part = {
         "mime_type": "image/png",
-        "data": base64.b64encode(image_data).decode("utf-8"),
+        "data": image_data,  # The SDK encodes raw bytes itself
     }
 
     try:
@@ -338,6 +708,7 @@ def render_pdf_region(
     page_num: int,
     bbox: tuple,
     scale: float = 2.0,
+    doc=None,
 ) -> bytes:
     """
     Render a specific region of a PDF page as a PNG image.
@@ -347,13 +718,16 @@ def render_pdf_region(
         page_num: Page number (0-indexed)
         bbox: Bounding box tuple (x0, y0, x1, y1)
         scale: Scale factor for rendering (default 2.0 for clarity)
+        doc: Already-open fitz.Document for pdf_path (left open for the caller)
 
     Returns:
         PNG image bytes of the rendered region
     """
     import fitz  # PyMuPDF
 
-    doc = fitz.open(pdf_path)
+    owns_doc = doc is None
+    if owns_doc:
+        doc = fitz.open(pdf_path)
     page = doc[page_num]
 
     # Create a clip rectangle from the bounding box
@@ -369,7 +743,8 @@ def render_pdf_region(
     # Convert to PNG bytes
     png_bytes = pix.tobytes("png")
 
-    doc.close()
+    if owns_doc:
+        doc.close()
     return png_bytes
 
 
@@ -379,6 +754,7 @@ def describe_formula_from_pdf(
     bbox: tuple,
     context: str = "",
     api_key: Optional[str] = None,
+    doc=None,
 ) -> str:
     """
     Render a formula region from a PDF and generate a human-readable description.
@@ -391,12 +767,13 @@ def describe_formula_from_pdf(
         bbox: Bounding box of the formula (x0, y0, x1, y1)
         context: Optional context about the formula
         api_key: Optional API key
+        doc: Already-open fitz.Document for pdf_path (left open for the caller)
 
     Returns:
         Human-readable description of the formula
     """
     # Render the formula region as an image
-    image_data = render_pdf_region(pdf_path, page_num, bbox, scale=2.0)
+    image_data = render_pdf_region(pdf_path, page_num, bbox, scale=2.0, doc=doc)
 
     # Generate description using Gemini Vision
     description = generate_formula_description(
@@ -408,6 +785,11 @@ def describe_formula_from_pdf(
     return description
 
 
+# Phrases validate_alt_text flags (case-insensitive)
+_BAD_START_RE = re.compile(r"image of|picture of|photo of|figure showing", re.IGNORECASE)
+_PLACEHOLDER_RE = re.compile(r"placeholder|todo|insert|add description", re.IGNORECASE)
+
+
 def validate_alt_text(alt_text: str) -> dict:
     """
     Validate alt-text quality based on accessibility guidelines.
@@ -426,13 +808,11 @@ def validate_alt_text(alt_text: str) -> dict:
         issues.append("Alt-text may be too long; consider being more concise")
 
     # Check for bad patterns
-    bad_starts = ["image of", "picture of", "photo of", "figure showing"]
-    if any(alt_text.lower().startswith(pat) for pat in bad_starts):
+    if _BAD_START_RE.match(alt_text):
         issues.append("Alt-text should not start with 'Image of' or similar phrases")
 
     # Check for placeholder text
-    placeholder_patterns = ["placeholder", "todo", "insert", "add description"]
-    if any(pat in alt_text.lower() for pat in placeholder_patterns):
+    if _PLACEHOLDER_RE.search(alt_text):
         issues.append("Alt-text appears to contain placeholder text")
 
     return {"valid": len(issues) == 0, "issues": issues}
@@ -7,12 +7,20 @@ Uses PyMuPDF (fitz) to:
 3. Identify which images likely need alt-text
 """
 
-import fitz  # PyMuPDF
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
-from PIL import Image
-import io
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field, replace
+import shutil
+import sys
+
+# PyMuPDF and PIL are imported where they are used, so importing this module
+# (e.g. for ExtractedFigure) stays cheap
+if TYPE_CHECKING:
+    import fitz
+
+# Longest side worth sending to the vision model; larger figures are
+# downscaled since the model resizes them anyway
+VISION_MAX_DIM = 1280
 
 
 @dataclass
@@ -21,97 +29,267 @@ class ExtractedFigure:
     page_num: int  # 0-indexed
     index: int  # Index on the page
     bbox: Tuple[float, float, float, float]  # (x0, y0, x1, y1)
-    width: int
+    width: int  # Source size, even when image_data was downscaled (max_dim)
     height: int
-    image_data: bytes  # Raw image bytes (PNG format)
+    image_data: Optional[bytes]  # Raw image bytes (PNG format); None once written to saved_path
     xref: int  # PDF internal reference
     has_alt_text: bool = False
     alt_text: Optional[str] = None
-
-
-def extract_figures(pdf_path: str, min_size: int = 50) -> List[ExtractedFigure]:
+    ext: str = "png"  # Format of image_data ("png" unless normalize_png=False)
+    saved_path: Optional[str] = None  # Set when extracted straight to disk
+    # (page_num, bbox) of later uses of the same image, filled with unique=True
+    other_occurrences: List[Tuple[int, Tuple[float, float, float, float]]] = field(default_factory=list)
+
+
+def extract_figures(
+    pdf_path: str,
+    min_size: int = 50,
+    doc: Optional["fitz.Document"] = None,
+    normalize_png: bool = True,
+    output_dir: Optional[str] = None,
+    unique: bool = False,
+    max_dim: Optional[int] = None,
+    warnings: Optional[List[str]] = None,
+) -> List[ExtractedFigure]:
     """
     Extract all figures/images from a PDF.
 
+    Each image xref is decoded at most once per call; later uses of it
+    (logos, running headers) reuse the first extraction. An image that
+    fails to extract is tried again where it recurs.
+
     Args:
         pdf_path: Path to the PDF file
         min_size: Minimum width/height to consider (filters out tiny icons)
+        doc: Already-open document for pdf_path (left open for the caller)
+        normalize_png: Convert every image to PNG. With False, images that
+            are not PNG keep their embedded format (see ExtractedFigure.ext)
+        output_dir: Write each image here as soon as it is extracted and
+            keep only its saved_path (see extract_figures_to_dir)
+        unique: Return one figure per image xref, recording its later
+            uses in other_occurrences, instead of one per use
+        max_dim: Downscale images whose longer side exceeds this many
+            pixels, re-encoding them as PNG (e.g. VISION_MAX_DIM before
+            alt-text generation). width/height keep the source size
+        warnings: List collecting a message for each image that could not
+            be extracted. Without it the messages go to stderr once
+            extraction ends (never stdout, which carries the MCP stdio stream)
 
     Returns:
         List of ExtractedFigure objects
     """
-    figures = []
-    doc = fitz.open(pdf_path)
+    import fitz  # PyMuPDF
+
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
 
+    owns_doc = doc is None
+    if owns_doc:
+        doc = fitz.open(pdf_path)
+
+    collected = [] if warnings is None else warnings
+    figures = []
+    seen = {}
     for page_num in range(len(doc)):
-        page = doc[page_num]
-        image_list = page.get_images(full=True)
+        figures.extend(_extract_page_figures(
+            doc, page_num, min_size, normalize_png, output_dir, unique, seen, max_dim, collected,
+        ))
+    if owns_doc:
+        doc.close()
+
+    if warnings is None:
+        for message in collected:
+            print(f"Warning: {message}", file=sys.stderr)
+    return figures
 
-        for img_index, img_info in enumerate(image_list):
-            xref = img_info[0]  # Image xref
 
-            try:
-                # Extract image
-                base_image = doc.extract_image(xref)
-                if not base_image:
-                    continue
+def extract_figures_to_dir(
+    pdf_path: str,
+    output_dir: str,
+    min_size: int = 50,
+    normalize_png: bool = True,
+    unique: bool = False,
+    warnings: Optional[List[str]] = None,
+) -> List[ExtractedFigure]:
+    """
+    Extract all figures from a PDF straight to files in output_dir.
 
-                image_bytes = base_image["image"]
-                width = base_image["width"]
-                height = base_image["height"]
+    Unlike extract_figures followed by save_figures, image bytes are never
+    held for the whole document: each figure is written as it is extracted,
+    and the returned figures carry saved_path with image_data set to None.
+    """
+    return extract_figures(
+        pdf_path, min_size=min_size,
+        normalize_png=normalize_png, output_dir=output_dir, unique=unique, warnings=warnings,
+    )
+
+
+def _extract_page_figures(
+    doc: "fitz.Document",
+    page_num: int,
+    min_size: int,
+    normalize_png: bool = True,
+    output_dir: Optional[str] = None,
+    unique: bool = False,
+    seen: Optional[Dict[int, Optional[ExtractedFigure]]] = None,
+    max_dim: Optional[int] = None,
+    warnings: Optional[List[str]] = None,
+) -> List[ExtractedFigure]:
+    """
+    Extract the figures on one page of an open document.
 
-                # Skip tiny images (likely icons, bullets, etc.)
-                if width < min_size or height < min_size:
+    `seen` maps xrefs already handled on earlier pages to their first figure
+    (None if skipped as too small), so repeated images are not decoded again.
+    Images that fail to extract are skipped with a message in `warnings`.
+    """
+    figures = []
+    page = doc[page_num]
+    image_list = page.get_images(full=True)
+    bboxes = None  # Image positions, looked up once per page when first needed
+    if seen is None:
+        seen = {}
+    if warnings is None:
+        warnings = []
+
+    for img_index, img_info in enumerate(image_list):
+        xref = img_info[0]  # Image xref
+
+        try:
+            if xref in seen:
+                first = seen[xref]
+                if first is None:
                     continue
-
-                # Convert to PNG for consistency
-                img = Image.open(io.BytesIO(image_bytes))
-                png_buffer = io.BytesIO()
-                img.save(png_buffer, format="PNG")
-                png_bytes = png_buffer.getvalue()
-
-                # Get bounding box from page
-                bbox = get_image_bbox(page, xref)
-
-                figure = ExtractedFigure(
-                    page_num=page_num,
-                    index=img_index,
-                    bbox=bbox,
-                    width=width,
-                    height=height,
-                    image_data=png_bytes,
-                    xref=xref,
-                )
+                if bboxes is None:
+                    bboxes = get_image_bboxes(page)
+                bbox = bboxes.get(xref) or tuple(page.rect)
+                if unique:
+                    first.other_occurrences.append((page_num, bbox))
+                    continue
+                figure = replace(first, page_num=page_num, index=img_index, bbox=bbox, other_occurrences=[])
+                if output_dir is not None:
+                    filepath = Path(output_dir) / _figure_filename(figure)
+                    shutil.copyfile(first.saved_path, filepath)
+                    figure.saved_path = str(filepath)
                 figures.append(figure)
+                continue
 
-            except Exception as e:
-                print(f"Warning: Could not extract image {xref} on page {page_num}: {e}")
+            # Skip tiny images (likely icons, bullets, etc.) using the size
+            # from the image dictionary, before decompressing the stream
+            listed_width, listed_height = img_info[2], img_info[3]
+            if listed_width and listed_height and (listed_width < min_size or listed_height < min_size):
+                seen[xref] = None
                 continue
 
-    doc.close()
+            # Extract image
+            base_image = doc.extract_image(xref)
+            if not base_image:
+                continue
+
+            image_bytes = base_image["image"]
+            width = base_image["width"]
+            height = base_image["height"]
+
+            # Size check for images whose dictionary lacked one
+            if width < min_size or height < min_size:
+                seen[xref] = None
+                continue
+
+            # Convert to PNG for consistency (PyMuPDF already hands out
+            # Flate-encoded images as PNG, so those need no re-encode)
+            ext = base_image["ext"]
+            oversized = max_dim is not None and max(width, height) > max_dim
+            if (ext == "png" or not normalize_png) and not oversized:
+                png_bytes = image_bytes
+            else:
+                png_bytes = _encode_png(doc, xref, image_bytes, max_dim if oversized else None)
+                ext = "png"
+
+            # Get bounding box from page (falls back to the page bounds)
+            if bboxes is None:
+                bboxes = get_image_bboxes(page)
+            bbox = bboxes.get(xref) or tuple(page.rect)
+
+            figure = ExtractedFigure(
+                page_num=page_num,
+                index=img_index,
+                bbox=bbox,
+                width=width,
+                height=height,
+                image_data=png_bytes,
+                xref=xref,
+                ext=ext,
+            )
+            if output_dir is not None:
+                filepath = Path(output_dir) / _figure_filename(figure)
+                filepath.write_bytes(png_bytes)
+                figure.saved_path = str(filepath)
+                figure.image_data = None
+            seen[xref] = figure
+            figures.append(figure)
+
+        except Exception as e:
+            warnings.append(f"Could not extract image {xref} on page {page_num}: {e}")
+            continue
+
     return figures
 
 
-def get_image_bbox(page: fitz.Page, xref: int) -> Tuple[float, float, float, float]:
-    """Get the bounding box of an image on a page by its xref."""
-    # Try to find the image in the page's image list with positions
-    for img in page.get_images(full=True):
-        if img[0] == xref:
-            # Get image rectangles
-            rects = page.get_image_rects(img)
-            if rects:
-                rect = rects[0]  # Use first occurrence
-                return (rect.x0, rect.y0, rect.x1, rect.y1)
+def _encode_png(
+    doc: "fitz.Document",
+    xref: int,
+    image_bytes: bytes,
+    max_dim: Optional[int] = None,
+) -> bytes:
+    """
+    Re-encode an embedded image as PNG, in PyMuPDF where it can decode it,
+    scaled down to fit max_dim if given.
+    """
+    import fitz  # PyMuPDF
+
+    try:
+        pix = fitz.Pixmap(doc, xref)
+        if pix.n - pix.alpha >= 4:  # PNG has no CMYK
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        if max_dim is not None:
+            width, height = _fit_within(pix.width, pix.height, max_dim)
+            pix = fitz.Pixmap(pix, width, height, None)
+        return pix.tobytes("png")
+    except RuntimeError:
+        # Formats MuPDF cannot decode here (e.g. JPX without codec support)
+        import io
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(image_bytes))
+        if max_dim is not None:
+            img = img.resize(_fit_within(img.width, img.height, max_dim))
+        png_buffer = io.BytesIO()
+        img.save(png_buffer, format="PNG")
+        return png_buffer.getvalue()
+
+
+def _fit_within(width: int, height: int, max_dim: int) -> Tuple[int, int]:
+    """Scale (width, height) down, keeping the aspect ratio, so neither side exceeds max_dim."""
+    scale = min(1.0, max_dim / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
 
-    # Fallback: return page bounds
-    rect = page.rect
-    return (rect.x0, rect.y0, rect.x1, rect.y1)
+def get_image_bboxes(page: "fitz.Page") -> Dict[int, Tuple[float, float, float, float]]:
+    """Map each image xref on a page to the bounding box of its first occurrence."""
+    bboxes = {}
+    for info in page.get_image_info(xrefs=True):
+        bboxes.setdefault(info["xref"], tuple(info["bbox"]))
+    return bboxes
+
+
+def _figure_filename(fig: ExtractedFigure) -> str:
+    return f"figure_p{fig.page_num + 1}_{fig.index}.{fig.ext}"
 
 
 def save_figures(figures: List[ExtractedFigure], output_dir: str) -> List[str]:
     """
     Save extracted figures to files.
 
+    Figures already written by extract_figures_to_dir keep their saved_path.
     Returns list of saved file paths.
     """
     output_path = Path(output_dir)
@@ -119,8 +297,10 @@ def save_figures(figures: List[ExtractedFigure], output_dir: str) -> List[str]:
 
     saved_paths = []
     for fig in figures:
-        filename = f"figure_p{fig.page_num + 1}_{fig.index}.png"
-        filepath = output_path / filename
+        if fig.image_data is None:
+            saved_paths.append(fig.saved_path)
+            continue
+        filepath = output_path / _figure_filename(fig)
         filepath.write_bytes(fig.image_data)
         saved_paths.append(str(filepath))
 
@@ -130,13 +310,16 @@ def save_figures(figures: List[ExtractedFigure], output_dir: str) -> List[str]:
 def get_figures_summary(figures: List[ExtractedFigure]) -> Dict:
     """Get a summary of extracted figures."""
     if not figures:
-        return {"count": 0, "pages": [], "figures": []}
+        return {"count": 0, "unique_images": 0, "pages": [], "figures": []}
 
-    pages_with_figures = sorted(set(f.page_num + 1 for f in figures))
+    pages_with_figures = set(f.page_num + 1 for f in figures)
+    for f in figures:
+        pages_with_figures.update(page_num + 1 for page_num, _ in f.other_occurrences)
 
     return {
         "count": len(figures),
-        "pages": pages_with_figures,
+        "unique_images": len(set(f.xref for f in figures)),
+        "pages": sorted(pages_with_figures),
         "figures": [
             {
                 "page": f.page_num + 1,
@@ -155,9 +338,79 @@ def extract_figure_context(pdf_path: str, figure: ExtractedFigure, context_chars
     Extract text context around a figure to help with alt-text generation.
 
     This gets text near the figure's bounding box that might be captions or descriptions.
+    For several figures use extract_figure_contexts, which opens the PDF only once.
+    """
+    return extract_figure_contexts(pdf_path, [figure], context_chars)[0]
+
+
+def extract_figure_contexts(
+    pdf_path: str,
+    figures: List[ExtractedFigure],
+    context_chars: int = 500,
+    doc: Optional["fitz.Document"] = None,
+) -> List[str]:
     """
-    doc = fitz.open(pdf_path)
-    page = doc[figure.page_num]
+    Extract text context for several figures, opening the PDF only once.
+
+    Pass `doc` to reuse a document already opened for pdf_path.
+    Returns a list of context strings in the same order as `figures`.
+    """
+    import fitz  # PyMuPDF
+
+    owns_doc = doc is None
+    if owns_doc:
+        doc = fitz.open(pdf_path)
+
+    # Visit each page once, then let it go; figures placed at the same spot
+    # (repeats of one image on a page) share a single text lookup
+    by_page = {}
+    for i, fig in enumerate(figures):
+        by_page.setdefault(fig.page_num, []).append(i)
+
+    contexts = [""] * len(figures)
+    for page_num, indices in by_page.items():
+        page = doc[page_num]
+        by_bbox = {}
+        for i in indices:
+            fig = figures[i]
+            context = by_bbox.get(fig.bbox)
+            if context is None:
+                context = by_bbox[fig.bbox] = _get_context_from_page(page, fig, context_chars)
+            contexts[i] = context
+    if owns_doc:
+        doc.close()
+    return contexts
+
+
+def extract_figures_with_contexts(
+    pdf_path: str,
+    min_size: int = 50,
+    context_chars: int = 500,
+    output_dir: Optional[str] = None,
+    max_dim: Optional[int] = None,
+    warnings: Optional[List[str]] = None,
+) -> Tuple[List[ExtractedFigure], List[str]]:
+    """
+    Extract figures and their text context from a single open of the PDF.
+
+    With output_dir, figures are written there as they are extracted (see
+    extract_figures_to_dir); max_dim and warnings are passed to
+    extract_figures. Returns (figures, contexts), with contexts in
+    the same order as figures.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        figures = extract_figures(
+            pdf_path, min_size=min_size, doc=doc, output_dir=output_dir, max_dim=max_dim, warnings=warnings,
+        )
+        contexts = extract_figure_contexts(pdf_path, figures, context_chars=context_chars, doc=doc)
+    return figures, contexts
+
+
+def _get_context_from_page(page: "fitz.Page", figure: ExtractedFigure, context_chars: int) -> str:
+    """Collect caption-like text above and below a figure on an open page."""
+    import fitz  # PyMuPDF
 
     # Expand the bounding box to capture nearby text
     x0, y0, x1, y1 = figure.bbox
@@ -171,8 +424,6 @@ def extract_figure_context(pdf_path: str, figure: ExtractedFigure, context_chars
     above_rect = fitz.Rect(x0 - margin, y0 - 100, x1 + margin, y0)
     above_text = page.get_text("text", clip=above_rect).strip()
 
-    doc.close()
-
     # Combine context
     context_parts = []
     if caption_text:
@@ -7,14 +7,21 @@ This module:
 3. Adds alt-text to figure environments
 """
 
+import hashlib
+import os
 import re
+import stat
+import threading
+import unicodedata
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
-from dataclasses import dataclass
+from string import Template
+from typing import Optional, List, Dict, Iterator, Set, TextIO, Tuple
+from dataclasses import dataclass, replace
 
 
-# Accessibility preamble to inject
-ACCESSIBILITY_PREAMBLE = r"""
+# Accessibility preamble to inject; $lang, $title and $author are filled in
+ACCESSIBILITY_PREAMBLE_TMPL = Template(r"""
 % ============================================
 % ACCESSIBILITY PREAMBLE (auto-generated)
 % ============================================
@@ -30,14 +37,14 @@ ACCESSIBILITY_PREAMBLE = r"""
     citecolor=blue,
     urlcolor=blue,
     pdfencoding=auto,
-    pdflang={en-US}
+    pdflang={$lang}
 ]{hyperref}
 \usepackage{pdfcomment}     % For tooltips/alt-text
 
 % Set document metadata
 \hypersetup{
-    pdftitle={},
-    pdfauthor={},
+    pdftitle={$title},
+    pdfauthor={$author},
     pdfsubject={},
     pdfkeywords={}
 }
@@ -48,10 +55,10 @@ ACCESSIBILITY_PREAMBLE = r"""
     \pdftooltip{\includegraphics[#2]{#3}}{#1}%
 }
 % ============================================
-"""
+""")
 
 # Minimal preamble (if axessibility causes issues)
-MINIMAL_PREAMBLE = r"""
+MINIMAL_PREAMBLE_TMPL = Template(r"""
 % ============================================
 % ACCESSIBILITY PREAMBLE (minimal)
 % ============================================
@@ -59,15 +66,50 @@ MINIMAL_PREAMBLE = r"""
     pdfusetitle,
     bookmarks=true,
     colorlinks=true,
-    pdflang={en-US}
+    pdflang={$lang}
 ]{hyperref}
 
 \hypersetup{
-    pdftitle={},
-    pdfauthor={}
+    pdftitle={$title},
+    pdfauthor={$author}
 }
 % ============================================
-"""
+""")
+
+# Regexes used by the analysis functions, compiled once at import
+_HYPERREF_RE = re.compile(r'\\usepackage.*\{hyperref\}')
+_AXESSIBILITY_RE = re.compile(r'\\usepackage.*\{axessibility\}')
+_PDFLANG_RE = re.compile(r'pdflang\s*=')
+_PDFTITLE_RE = re.compile(r'pdftitle\s*=\s*\{[^}]+\}')
+_FIGURE_BEGIN = r'\begin{figure}'
+_FIGURE_END = r'\end{figure}'
+_FIGURE_INCLUDEGRAPHICS_RE = re.compile(r'\\includegraphics(?:\[.*?\])?\{([^}]+)\}')
+_CAPTION_RE = re.compile(r'\\caption\{([^}]+)\}')
+_LABEL_RE = re.compile(r'\\label\{([^}]+)\}')
+_ALT_TEXT_MARKER_RE = re.compile(r'\\pdftooltip|\\accessiblefigure')
+_TITLE_RE = re.compile(r'\\title\{([^}]+)\}')
+_AUTHOR_RE = re.compile(r'\\author\{([^}]+)\}')
+_AUTHOR_AND_RE = re.compile(r'\\and')
+_AUTHOR_COMMAND_RE = re.compile(r'\\[a-zA-Z]+\{[^}]*\}')
+_WHITESPACE_RE = re.compile(r'\s+')
+_INCLUDEGRAPHICS_RE = re.compile(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}')
+_GRAPHICSPATH_RE = re.compile(r'\\graphicspath\{(.*?)\}', re.DOTALL)
+_BRACED_RE = re.compile(r'\{([^}]*)\}')
+_DOCUMENTCLASS_RE = re.compile(r'\\documentclass.*?\n')
+_BEGIN_DOCUMENT_RE = re.compile(r'\\begin\{document\}')
+_PREAMBLE_HYPERREF_RE = re.compile(r'\\usepackage\[[\s\S]*?\]\{hyperref\}')
+_INCLUDEGRAPHICS_PARTS_RE = re.compile(r'(\\includegraphics)(\[[^\]]*\])?\{([^}]+)\}')
+
+# Special characters escaped in alt-text, in a single translate() pass
+_LATEX_ESCAPE = str.maketrans({
+    '\\': '\\textbackslash ',
+    '{': '\\{', '}': '\\}',
+    '%': '\\%', '&': '\\&',
+    '_': '\\_', '#': '\\#',
+})
+
+# Extensions LaTeX tries for an \includegraphics reference, in order
+IMAGE_EXTENSIONS = ('', '.pdf', '.png', '.jpg', '.jpeg', '.eps', '.svg')
 
 
 @dataclass
@@ -83,12 +125,100 @@ class LaTeXFigure:
     alt_text: Optional[str] = None
 
 
+def read_latex_source(latex_path) -> Tuple[str, str]:
+    """
+    Read a LaTeX source file in one shot.
+
+    Decodes as UTF-8 regardless of the locale, falling back to Latin-1
+    (which maps every byte) for legacy sources.
+
+    Returns:
+        Tuple of (content, encoding). Pass the encoding to write_latex_file
+        or open_latex_output so the output keeps the source's encoding.
+    """
+    data = Path(latex_path).read_bytes()
+    try:
+        return data.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        return data.decode("latin-1"), "latin-1"
+
+
+def read_latex_file(latex_path) -> str:
+    """Read a LaTeX source file, decoded as described in read_latex_source."""
+    return read_latex_source(latex_path)[0]
+
+
+def open_latex_output(output_path, encoding: str = "utf-8") -> TextIO:
+    """
+    Open output_path for writing LaTeX in the source's encoding.
+
+    Text a Latin-1 source cannot represent (e.g. curly quotes in generated
+    alt-text) is written as '?' rather than failing the whole write.
+    """
+    errors = "strict" if encoding == "utf-8" else "replace"
+    return open(output_path, "w", encoding=encoding, errors=errors)
+
+
+def write_latex_file(output_path, latex_content: str, encoding: str = "utf-8"):
+    """Write LaTeX content in the given source encoding."""
+    with open_latex_output(output_path, encoding) as out:
+        out.write(latex_content)
+
+
+def _fingerprint(latex_content: str) -> bytes:
+    """Short digest of LaTeX content, used as a cache key."""
+    return hashlib.blake2b(latex_content.encode("utf-8", "ignore"), digest_size=16).digest()
+
+
+class _ContentCache:
+    """Thread-safe LRU of results keyed by content fingerprint."""
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# MCP clients re-analyze the same file repeatedly while editing
+_analysis_cache = _ContentCache()
+_figures_cache = _ContentCache()
+
+
 def analyze_latex(latex_content: str) -> Dict:
     """
     Analyze LaTeX content for accessibility features.
 
     Returns dict with analysis results.
     """
+    key = _fingerprint(latex_content)
+    cached = _analysis_cache.get(key)
+    if cached is None:
+        cached = _analyze_latex(latex_content)
+        _analysis_cache.put(key, cached)
+
+    # Fresh containers so callers can annotate the result freely
+    return {
+        **cached,
+        "figures": [dict(f) for f in cached["figures"]],
+        "recommendations": list(cached["recommendations"]),
+    }
+
+
+def _analyze_latex(latex_content: str) -> Dict:
     results = {
         "has_hyperref": False,
         "has_axessibility": False,
@@ -100,26 +230,24 @@ def analyze_latex(latex_content: str) -> Dict:
         "recommendations": [],
     }
 
-    # Check for packages
-    results["has_hyperref"] = bool(re.search(r'\\usepackage.*\{hyperref\}', latex_content))
-    results["has_axessibility"] = bool(re.search(r'\\usepackage.*\{axessibility\}', latex_content))
-    results["has_pdflang"] = bool(re.search(r'pdflang\s*=', latex_content))
-    results["has_pdftitle"] = bool(re.search(r'pdftitle\s*=\s*\{[^}]+\}', latex_content))
+    # Check for packages. Separate searches beat one combined alternation
+    # here: each pattern starts with a literal, which re scans for quickly
+    results["has_hyperref"] = bool(_HYPERREF_RE.search(latex_content))
+    results["has_axessibility"] = bool(_AXESSIBILITY_RE.search(latex_content))
+    results["has_pdflang"] = bool(_PDFLANG_RE.search(latex_content))
+    results["has_pdftitle"] = bool(_PDFTITLE_RE.search(latex_content))
 
     # Check for our accessibility preamble marker
     results["has_accessibility_preamble"] = "ACCESSIBILITY PREAMBLE" in latex_content
 
-    # Find figures
-    figures = find_figures(latex_content)
-    results["figures"] = [
-        {
+    # Find figures, summarizing and counting alt-text in one pass
+    for f in find_figures(latex_content):
+        results["figures"].append({
             "image_path": f.image_path,
             "caption": f.caption[:50] + "..." if f.caption and len(f.caption) > 50 else f.caption,
             "has_alt_text": f.has_alt_text,
-        }
-        for f in figures
-    ]
-    results["figures_with_alt"] = sum(1 for f in figures if f.has_alt_text)
+        })
+        results["figures_with_alt"] += f.has_alt_text
 
     # Generate recommendations
     if not results["has_accessibility_preamble"]:
@@ -138,32 +266,55 @@ def analyze_latex(latex_content: str) -> Dict:
 
 def find_figures(latex_content: str) -> List[LaTeXFigure]:
     """Find all figure environments in LaTeX content."""
+    key = _fingerprint(latex_content)
+    cached = _figures_cache.get(key)
+    if cached is None:
+        cached = tuple(_find_figures(latex_content))
+        _figures_cache.put(key, cached)
+    # Fresh records so callers can set alt_text without touching the cache
+    return [replace(fig) for fig in cached]
+
+
+def _iter_figure_spans(latex_content: str) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) of each figure environment in latex_content."""
+    # Plain substring scan for environment bounds: linear even when an
+    # \end{figure} is missing, unlike a lazy DOTALL regex
+    pos = 0
+    while True:
+        start = latex_content.find(_FIGURE_BEGIN, pos)
+        if start == -1:
+            return
+        end = latex_content.find(_FIGURE_END, start + len(_FIGURE_BEGIN))
+        if end == -1:
+            return
+        pos = end + len(_FIGURE_END)
+        yield start, pos
+
+
+def _find_figures(latex_content: str) -> List[LaTeXFigure]:
     figures = []
 
-    # Pattern for figure environments
-    figure_pattern = r'\\begin\{figure\}.*?\\end\{figure\}'
-
-    for match in re.finditer(figure_pattern, latex_content, re.DOTALL):
-        fig_content = match.group()
+    for start, end in _iter_figure_spans(latex_content):
+        fig_content = latex_content[start:end]
 
         # Extract image path
-        img_match = re.search(r'\\includegraphics(?:\[.*?\])?\{([^}]+)\}', fig_content)
+        img_match = _FIGURE_INCLUDEGRAPHICS_RE.search(fig_content)
         image_path = img_match.group(1) if img_match else ""
 
         # Extract caption
-        caption_match = re.search(r'\\caption\{([^}]+)\}', fig_content)
+        caption_match = _CAPTION_RE.search(fig_content)
         caption = caption_match.group(1) if caption_match else None
 
         # Extract label
-        label_match = re.search(r'\\label\{([^}]+)\}', fig_content)
+        label_match = _LABEL_RE.search(fig_content)
         label = label_match.group(1) if label_match else None
 
         # Check for alt-text (pdftooltip or our accessiblefigure macro)
-        has_alt = bool(re.search(r'\\pdftooltip|\\accessiblefigure', fig_content))
+        has_alt = bool(_ALT_TEXT_MARKER_RE.search(fig_content))
 
         figures.append(LaTeXFigure(
-            start_pos=match.start(),
-            end_pos=match.end(),
+            start_pos=start,
+            end_pos=end,
             full_match=fig_content,
             image_path=image_path,
             caption=caption,
@@ -177,7 +328,7 @@ def find_figures(latex_content: str) -> List[LaTeXFigure]:
 def find_preamble_insertion_point(latex_content: str) -> int:
     """Find the best position to insert the accessibility preamble."""
     # Look for \documentclass
-    doc_class = re.search(r'\\documentclass.*?\n', latex_content)
+    doc_class = _DOCUMENTCLASS_RE.search(latex_content)
     if doc_class:
         # Insert after documentclass
         return doc_class.end()
@@ -188,7 +339,7 @@ def find_preamble_insertion_point(latex_content: str) -> int:
 
 def find_begin_document(latex_content: str) -> int:
     """Find position of \\begin{document}."""
-    match = re.search(r'\\begin\{document\}', latex_content)
+    match = _BEGIN_DOCUMENT_RE.search(latex_content)
     return match.start() if match else len(latex_content)
 
 
@@ -212,31 +363,57 @@ def add_accessibility_preamble(
     Returns:
         Modified LaTeX content with preamble
     """
+    return "".join(iter_preamble_inserted(latex_content, title, author, lang, minimal))
+
+
+def write_accessibility_preamble(
+    latex_content: str,
+    out_stream: TextIO,
+    title: str = "",
+    author: str = "",
+    lang: str = "en-US",
+    minimal: bool = False,
+):
+    """
+    Write LaTeX content with the accessibility preamble to out_stream.
+
+    Same result as add_accessibility_preamble, without building the
+    modified document in memory first.
+    """
+    for piece in iter_preamble_inserted(latex_content, title, author, lang, minimal):
+        out_stream.write(piece)
+
+
+def iter_preamble_inserted(
+    latex_content: str,
+    title: str = "",
+    author: str = "",
+    lang: str = "en-US",
+    minimal: bool = False,
+) -> Iterator[str]:
+    """Yield the pieces of latex_content with the accessibility preamble inserted."""
     # Check if already has our preamble
     if "ACCESSIBILITY PREAMBLE" in latex_content:
-        return latex_content
-
-    # Choose preamble
-    preamble = MINIMAL_PREAMBLE if minimal else ACCESSIBILITY_PREAMBLE
+        yield latex_content
+        return
 
-    # Customize preamble with metadata
-    preamble = preamble.replace('pdflang={en-US}', f'pdflang={{{lang}}}')
-    preamble = preamble.replace('pdftitle={}', f'pdftitle={{{title}}}')
-    preamble = preamble.replace('pdfauthor={}', f'pdfauthor={{{author}}}')
+    # Choose preamble and customize it with metadata
+    template = MINIMAL_PREAMBLE_TMPL if minimal else ACCESSIBILITY_PREAMBLE_TMPL
+    preamble = template.substitute(lang=lang, title=title, author=author)
 
     # Find insertion point (after \documentclass, before \begin{document})
     insert_pos = find_preamble_insertion_point(latex_content)
 
     # Check if hyperref already exists - if so, we need to be careful
-    if re.search(r'\\usepackage.*\{hyperref\}', latex_content):
+    if _HYPERREF_RE.search(latex_content):
         # Remove hyperref from our preamble to avoid conflict
-        preamble = re.sub(r'\\usepackage\[[\s\S]*?\]\{hyperref\}', '', preamble)
+        preamble = _PREAMBLE_HYPERREF_RE.sub('', preamble)
         preamble = preamble.replace('% For hyperref options below', '')
 
     # Insert preamble
-    new_content = latex_content[:insert_pos] + preamble + latex_content[insert_pos:]
-
-    return new_content
+    yield latex_content[:insert_pos]
+    yield preamble
+    yield latex_content[insert_pos:]
 
 
 def add_figure_alt_text(
@@ -261,10 +438,16 @@ def add_figure_alt_text(
         raise ValueError(f"Figure index {figure_index} out of range (found {len(figures)} figures)")
 
     fig = figures[figure_index]
+    new_fig_content = _rewrite_figure_with_alt(fig.full_match, alt_text, figure_index)
+
+    # Replace in the full document
+    return latex_content[:fig.start_pos] + new_fig_content + latex_content[fig.end_pos:]
 
+
+def _rewrite_figure_with_alt(fig_full_match: str, alt_text: str, figure_index: int) -> str:
+    """Wrap the figure's \\includegraphics in a \\pdftooltip carrying alt_text."""
     # Find the \includegraphics command in this figure
-    img_pattern = r'(\\includegraphics)(\[[^\]]*\])?\{([^}]+)\}'
-    img_match = re.search(img_pattern, fig.full_match)
+    img_match = _INCLUDEGRAPHICS_PARTS_RE.search(fig_full_match)
 
     if not img_match:
         raise ValueError(f"Could not find \\includegraphics in figure {figure_index}")
@@ -274,20 +457,12 @@ def add_figure_alt_text(
     path = img_match.group(3)
 
     # Escape special characters in alt-text for LaTeX
-    safe_alt = alt_text.replace('\\', '\\textbackslash ')
-    safe_alt = safe_alt.replace('{', '\\{').replace('}', '\\}')
-    safe_alt = safe_alt.replace('%', '\\%').replace('&', '\\&')
-    safe_alt = safe_alt.replace('_', '\\_').replace('#', '\\#')
+    safe_alt = alt_text.translate(_LATEX_ESCAPE)
 
     new_includegraphics = f'\\pdftooltip{{\\includegraphics{options}{{{path}}}}}{{{safe_alt}}}'
 
     # Replace in the figure
-    new_fig_content = fig.full_match[:img_match.start()] + new_includegraphics + fig.full_match[img_match.end():]
-
-    # Replace in the full document
-    new_content = latex_content[:fig.start_pos] + new_fig_content + latex_content[fig.end_pos:]
-
-    return new_content
+    return fig_full_match[:img_match.start()] + new_includegraphics + fig_full_match[img_match.end():]
 
 
 def add_all_figure_alt_texts(
@@ -304,33 +479,40 @@ def add_all_figure_alt_texts(
     Returns:
         Modified LaTeX content
     """
-    figures = find_figures(latex_content)
+    # Only the environment bounds are needed here, not the full
+    # find_figures() parse of captions and labels
+    spans = list(_iter_figure_spans(latex_content))
 
-    if len(alt_texts) != len(figures):
-        raise ValueError(f"Got {len(alt_texts)} alt-texts for {len(figures)} figures")
+    if len(alt_texts) != len(spans):
+        raise ValueError(f"Got {len(alt_texts)} alt-texts for {len(spans)} figures")
 
-    # Work backwards to preserve positions
-    for i in range(len(figures) - 1, -1, -1):
-        latex_content = add_figure_alt_text(latex_content, i, alt_texts[i])
+    # Stitch the rewritten figures into the untouched text between them
+    pieces = []
+    last = 0
+    for i, ((start, end), alt_text) in enumerate(zip(spans, alt_texts)):
+        pieces.append(latex_content[last:start])
+        pieces.append(_rewrite_figure_with_alt(latex_content[start:end], alt_text, i))
+        last = end
+    pieces.append(latex_content[last:])
 
-    return latex_content
+    return "".join(pieces)
 
 
 def extract_title_from_latex(latex_content: str) -> Optional[str]:
     """Extract document title from LaTeX content."""
-    match = re.search(r'\\title\{([^}]+)\}', latex_content)
+    match = _TITLE_RE.search(latex_content)
     return match.group(1) if match else None
 
 
 def extract_author_from_latex(latex_content: str) -> Optional[str]:
     """Extract author from LaTeX content."""
-    match = re.search(r'\\author\{([^}]+)\}', latex_content)
+    match = _AUTHOR_RE.search(latex_content)
     if match:
         # Clean up author (remove \and, affiliations, etc.)
         author = match.group(1)
-        author = re.sub(r'\\and', ', ', author)
-        author = re.sub(r'\\[a-zA-Z]+\{[^}]*\}', '', author)  # Remove commands
-        author = re.sub(r'\s+', ' ', author).strip()
+        author = _AUTHOR_AND_RE.sub(', ', author)
+        author = _AUTHOR_COMMAND_RE.sub('', author)  # Remove commands
+        author = _WHITESPACE_RE.sub(' ', author).strip()
         return author
     return None
 
@@ -347,8 +529,7 @@ def get_all_image_paths(latex_content: str) -> List[str]:
     """
     paths = []
     # Match \includegraphics with optional arguments
-    pattern = r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}'
-    for match in re.finditer(pattern, latex_content):
+    for match in _INCLUDEGRAPHICS_RE.finditer(latex_content):
         paths.append(match.group(1))
     return paths
 
@@ -374,36 +555,93 @@ def resolve_image_path(
     Returns:
         Path to the image file if found, None otherwise
     """
-    # Common image extensions LaTeX supports
-    extensions = ['', '.pdf', '.png', '.jpg', '.jpeg', '.eps', '.svg']
+    dirs_to_search = _image_search_dirs(base_dir, search_dirs)
+
+    # Try to find the file (the '' extension covers references that
+    # already carry one)
+    for search_dir in dirs_to_search:
+        for ext in IMAGE_EXTENSIONS:
+            candidate = search_dir / f"{image_ref}{ext}"
+            if _stat_is(candidate, stat.S_ISREG):
+                return candidate
+
+    return None
+
+
+def _stat_is(path: Path, test) -> bool:
+    """Check a stat.S_IS* predicate against path with a single stat call."""
+    try:
+        return test(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
 
-    # Directories to search
+
+def _image_search_dirs(base_dir: Path, search_dirs: Optional[List[str]] = None) -> List[Path]:
+    """Directories resolve_image_path searches, in order."""
     dirs_to_search = [base_dir]
     if search_dirs:
         for d in search_dirs:
             search_path = base_dir / d
-            if search_path.exists():
+            if _stat_is(search_path, stat.S_ISDIR):
                 dirs_to_search.append(search_path)
 
     # Also check common subdirectories
     for subdir in ['figures', 'images', 'img', 'figs', 'graphics']:
         subpath = base_dir / subdir
-        if subpath.exists() and subpath not in dirs_to_search:
+        if subpath not in dirs_to_search and _stat_is(subpath, stat.S_ISDIR):
             dirs_to_search.append(subpath)
 
-    # Try to find the file
+    return dirs_to_search
+
+
+def _fold_name(name: str) -> str:
+    """File name folded for case- and normalization-insensitive comparison."""
+    return unicodedata.normalize("NFC", name).casefold()
+
+
+def _list_file_names(directory: Path) -> Optional[Set[str]]:
+    """
+    Folded names of the files in directory.
+
+    Returns an empty set if the directory does not exist, and None if it
+    exists but cannot be listed (e.g. execute-only permissions).
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {_fold_name(entry.name) for entry in entries if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError, ValueError):
+        return set()
+    except OSError:
+        return None
+
+
+def _resolve_listed_image_path(
+    image_ref: str,
+    dirs_to_search: List[Path],
+    listings: Dict[Path, Optional[Set[str]]],
+) -> Optional[Path]:
+    """
+    resolve_image_path against cached directory listings.
+
+    `listings` maps each directory already read to the folded names of the
+    files in it and is filled as needed, so candidates that cannot exist are
+    ruled out without a stat. Names that might match are still confirmed
+    with a stat, leaving case sensitivity to the filesystem exactly as in
+    resolve_image_path; directories that cannot be listed are stat'ed per
+    candidate.
+    """
     for search_dir in dirs_to_search:
-        for ext in extensions:
+        for ext in IMAGE_EXTENSIONS:
             candidate = search_dir / f"{image_ref}{ext}"
-            if candidate.exists() and candidate.is_file():
+            directory = candidate.parent
+            if directory not in listings:
+                listings[directory] = _list_file_names(directory)
+            names = listings[directory]
+            if names is not None and _fold_name(candidate.name) not in names:
+                continue
+            if _stat_is(candidate, stat.S_ISREG):
                 return candidate
 
-            # Also try without adding extension if image_ref already has one
-            if ext == '' and '.' in image_ref:
-                candidate = search_dir / image_ref
-                if candidate.exists() and candidate.is_file():
-                    return candidate
-
     return None
 
 
@@ -414,10 +652,10 @@ def extract_graphicspath(latex_content: str) -> List[str]:
     \\graphicspath{{./figures/}{./images/}}
     """
     paths = []
-    match = re.search(r'\\graphicspath\{(.*?)\}', latex_content, re.DOTALL)
+    match = _GRAPHICSPATH_RE.search(latex_content)
     if match:
         # Extract individual paths from {{path1}{path2}}
-        path_matches = re.findall(r'\{([^}]*)\}', match.group(1))
+        path_matches = _BRACED_RE.findall(match.group(1))
         paths.extend(path_matches)
     return paths
 
@@ -448,7 +686,8 @@ def check_figure_files(
         Dict with 'found', 'missing', and 'all' lists of FigureFileStatus
     """
     base_dir = Path(latex_file_path).parent
-    graphicspath_dirs = extract_graphicspath(latex_content)
+    dirs_to_search = _image_search_dirs(base_dir, extract_graphicspath(latex_content))
+    listings = {}
 
     figures = find_figures(latex_content)
 
@@ -457,7 +696,7 @@ def check_figure_files(
     all_figures = []
 
     for i, fig in enumerate(figures):
-        resolved = resolve_image_path(fig.image_path, base_dir, graphicspath_dirs)
+        resolved = _resolve_listed_image_path(fig.image_path, dirs_to_search, listings)
 
         status = FigureFileStatus(
             figure_index=i,
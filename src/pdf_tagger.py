@@ -140,6 +140,32 @@ def create_basic_structure(
     return output_path
 
 
+# Linux ioctl for copy-on-write file clones (btrfs, XFS, etc.)
+FICLONE = 0x40049409
+
+
+def copy_pdf(src_path: str, dst_path: str) -> str:
+    """
+    Copy a PDF, cloning it copy-on-write where the filesystem supports it.
+
+    Falls back to shutil.copy (which uses in-kernel sendfile on Linux).
+    A hard link is not used since later edits to either file would show
+    up in both.
+    """
+    import os
+    import shutil
+    if os.path.exists(dst_path) and os.path.samefile(src_path, dst_path):
+        return dst_path
+    try:
+        import fcntl
+        with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copymode(src_path, dst_path)
+    except (ImportError, OSError):
+        shutil.copy(src_path, dst_path)
+    return dst_path
+
+
 def extract_title_from_pdf(pdf_path: str) -> Optional[str]:
     """Extract potential title from first page of PDF using PyMuPDF."""
     try:
@@ -957,27 +983,30 @@ def generate_formula_descriptions(
     descriptions = {}
     formula_count = 0
 
-    for elem in elements:
-        if elem["type"] != "Formula":
-            continue
+    # Open the PDF once for all formula renders
+    with fitz.open(pdf_path) as doc:
+        for elem in elements:
+            if elem["type"] != "Formula":
+                continue
 
-        if formula_count >= max_formulas:
-            break
+            if formula_count >= max_formulas:
+                break
 
-        key = (elem["page"], elem["block_idx"])
-        bbox = tuple(elem["bbox"])
+            key = (elem["page"], elem["block_idx"])
+            bbox = tuple(elem["bbox"])
 
-        try:
-            description = describe_formula_from_pdf(
-                pdf_path=pdf_path,
-                page_num=elem["page"],
-                bbox=bbox,
-            )
-            descriptions[key] = description
-            formula_count += 1
-        except Exception as e:
-            # Fallback on error
-            descriptions[key] = f"Mathematical formula: {elem['text'][:100]}"
+            try:
+                description = describe_formula_from_pdf(
+                    pdf_path=pdf_path,
+                    page_num=elem["page"],
+                    bbox=bbox,
+                    doc=doc,
+                )
+                descriptions[key] = description
+                formula_count += 1
+            except Exception as e:
+                # Fallback on error
+                descriptions[key] = f"Mathematical formula: {elem['text'][:100]}"
 
     return descriptions
 
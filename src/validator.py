@@ -14,6 +14,7 @@ from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 import re
 
 
@@ -618,6 +619,55 @@ def calculate_morphmind_score(
     )
 
 
+@lru_cache(maxsize=1024)
+def _cached_morphmind_score(
+    passed_rules: int,
+    failed_rules: int,
+    passed_checks: int,
+    failed_checks: int,
+    failures: Tuple[Tuple[str, Optional[int], str, int], ...],
+) -> MorphMindScore:
+    """calculate_morphmind_score() keyed on hashable (clause, test, message, count) tuples."""
+    return calculate_morphmind_score(
+        passed_rules=passed_rules,
+        failed_rules=failed_rules,
+        passed_checks=passed_checks,
+        failed_checks=failed_checks,
+        failures=[
+            {"clause": clause, "test": test, "message": message, "count": count}
+            for clause, test, message, count in failures
+        ],
+    )
+
+
+def score_verapdf_result(result: Dict) -> MorphMindScore:
+    """
+    Calculate the MorphMind score for a run_verapdf() result.
+
+    Scoring is a pure function of the summary counts and failures, so
+    repeat validations of the same document reuse the earlier result.
+    The returned MorphMindScore is shared between callers; treat it as
+    read-only.
+    """
+    summary = result["summary"]
+    failures = tuple(
+        (
+            failure.get("clause", ""),
+            failure.get("test_number"),
+            failure.get("description", ""),
+            len(failure.get("checks", [1])),
+        )
+        for failure in result.get("failures", [])
+    )
+    return _cached_morphmind_score(
+        summary["passed_rules"],
+        summary["failed_rules"],
+        summary["passed_checks"],
+        summary["failed_checks"],
+        failures,
+    )
+
+
 def parse_verapdf_for_score(verapdf_result: str) -> MorphMindScore:
     """
     Parse veraPDF validation result and calculate MorphMind score.